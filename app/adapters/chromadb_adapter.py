@@ -1,72 +1,103 @@
+import asyncio
+import logging
 import chromadb
-from typing import List
-from app.core.vector_store import VectorStoreAdapter, Document, SearchResult
-from sentence_transformers import SentenceTransformer
+from typing import List, Optional
+import numpy as np
+from app.core.vector_store import VectorStoreAdapter, Document, SearchResult, content_hash_id
+from app.core.embeddings import get_embedder
+
+logger = logging.getLogger(__name__)
 
 
 class ChromaDBAdapter(VectorStoreAdapter):
     """Adaptador para ChromaDB como banco vetorial."""
 
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", device: str = "auto"):
         """
         Inicializa o adaptador ChromaDB.
 
         Args:
             model_name: Modelo de embeddings do Sentence Transformers
+            device: Dispositivo do modelo de embeddings (auto, cpu, cuda)
         """
         self.client = chromadb.Client()
-        self.embedding_model = SentenceTransformer(model_name)
+        self.embedding_model = get_embedder(model_name, device)
         self.collections = {}
 
-    async def add_documents(self, documents: List[Document], collection_name: str) -> List[str]:
+    async def add_documents(
+        self,
+        documents: List[Document],
+        collection_name: str,
+        batch_size: Optional[int] = None,
+    ) -> List[str]:
         """Adiciona documentos ao ChromaDB."""
         try:
             # Obter ou criar coleção
-            if collection_name not in self.collections:
-                self.collections[collection_name] = self.client.get_or_create_collection(
+            collection = self.collections.get(collection_name)
+            if collection is None:
+                collection = await asyncio.to_thread(
+                    self.client.get_or_create_collection,
                     name=collection_name,
                     metadata={"hnsw:space": "cosine"}
                 )
+                self.collections[collection_name] = collection
 
-            collection = self.collections[collection_name]
+            ids = [doc.doc_id or content_hash_id(doc.content) for doc in documents]
 
-            # Gerar embeddings
-            texts = [doc.content for doc in documents]
-            embeddings = self.embedding_model.encode(
-                texts, convert_to_tensor=False).tolist()
+            # Reingestão idempotente: não gera embeddings para IDs já gravados
+            stored = await asyncio.to_thread(collection.get, ids=ids, include=[])
+            existing = set(stored["ids"])
+            pending = {}
+            for doc_id, doc in zip(ids, documents):
+                if doc_id not in existing:
+                    pending.setdefault(doc_id, doc)
+
+            if not pending:
+                return ids
 
-            # Preparar dados
-            ids = [doc.doc_id or f"doc_{i}" for i, doc in enumerate(documents)]
-            metadatas = [doc.metadata for doc in documents]
+            # Gerar embeddings
+            texts = [doc.content for doc in pending.values()]
+            embeddings = await asyncio.to_thread(
+                self.embedding_model.encode, texts, batch_size
+            )
 
-            # Adicionar ao ChromaDB
-            collection.add(
-                ids=ids,
+            # Adicionar ao ChromaDB (aceita o ndarray diretamente)
+            await asyncio.to_thread(
+                collection.add,
+                ids=list(pending),
                 embeddings=embeddings,
-                metadatas=metadatas,
+                metadatas=[doc.to_metadata() for doc in pending.values()],
                 documents=texts
             )
 
             return ids
-        except Exception as e:
-            print(f"Erro ao adicionar documentos no ChromaDB: {str(e)}")
+        except Exception:
+            logger.exception("Erro ao adicionar documentos no ChromaDB (coleção %s)", collection_name)
             raise
 
-    async def search(self, query: str, collection_name: str, top_k: int = 5) -> List[SearchResult]:
+    async def search(
+        self,
+        query: str,
+        collection_name: str,
+        top_k: int = 5,
+        query_embedding: Optional[np.ndarray] = None
+    ) -> List[SearchResult]:
         """Busca documentos similares no ChromaDB."""
         try:
-            if collection_name not in self.collections:
+            collection = self.collections.get(collection_name)
+            if collection is None:
                 return []
 
-            collection = self.collections[collection_name]
-
-            # Gerar embedding da query
-            query_embedding = self.embedding_model.encode(
-                [query], convert_to_tensor=False).tolist()[0]
+            # Gerar embedding da query (se o chamador não o forneceu)
+            if query_embedding is None:
+                query_embedding = await asyncio.to_thread(
+                    self.embedding_model.encode_query, query
+                )
 
             # Buscar
-            results = collection.query(
-                query_embeddings=[query_embedding],
+            results = await asyncio.to_thread(
+                collection.query,
+                query_embeddings=query_embedding[None, :],
                 n_results=top_k,
                 include=["documents", "metadatas", "distances"]
             )
@@ -80,39 +111,41 @@ class ChromaDBAdapter(VectorStoreAdapter):
                     results["distances"][0]
                 ):
                     # ChromaDB retorna distância, convertemos para score de similaridade
-                    score = 1 - distance
+                    score = 1 - float(distance)
                     search_results.append(
                         SearchResult(content=doc, score=score,
                                      metadata=metadata)
                     )
 
             return search_results
-        except Exception as e:
-            print(f"Erro ao buscar no ChromaDB: {str(e)}")
+        except Exception:
+            logger.exception("Erro ao buscar no ChromaDB (coleção %s)", collection_name)
             raise
 
     async def delete_documents(self, doc_ids: List[str], collection_name: str) -> bool:
         """Remove documentos do ChromaDB."""
         try:
-            if collection_name not in self.collections:
+            collection = self.collections.get(collection_name)
+            if collection is None:
                 return False
 
-            collection = self.collections[collection_name]
-            collection.delete(ids=doc_ids)
+            await asyncio.to_thread(collection.delete, ids=doc_ids)
             return True
-        except Exception as e:
-            print(f"Erro ao deletar documentos no ChromaDB: {str(e)}")
+        except Exception:
+            logger.exception("Erro ao deletar documentos no ChromaDB (coleção %s)", collection_name)
             return False
 
     async def delete_collection(self, collection_name: str) -> bool:
         """Remove uma coleção do ChromaDB."""
         try:
             if collection_name in self.collections:
-                self.client.delete_collection(name=collection_name)
+                await asyncio.to_thread(
+                    self.client.delete_collection, name=collection_name
+                )
                 del self.collections[collection_name]
             return True
-        except Exception as e:
-            print(f"Erro ao deletar coleção no ChromaDB: {str(e)}")
+        except Exception:
+            logger.exception("Erro ao deletar coleção %s no ChromaDB", collection_name)
             return False
 
     async def health_check(self) -> bool:
@@ -1,8 +1,163 @@
-from typing import List, Optional
-from app.core.vector_store import VectorStoreAdapter, Document, SearchResult
-from sentence_transformers import SentenceTransformer
-from pymongo import MongoClient
-from pymongo.errors import ConnectionFailure
+import asyncio
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from app.core.vector_store import VectorStoreAdapter, Document, SearchResult, content_hash_id
+from app.core.embeddings import get_embedder
+from app.core.similarity import cosine_scores, top_k_indices
+from bson import Binary
+from pymongo import InsertOne, MongoClient
+from pymongo.errors import BulkWriteError, ConnectionFailure
+
+logger = logging.getLogger(__name__)
+
+# Código de erro do MongoDB para chave duplicada
+DUPLICATE_KEY_ERROR = 11000
+
+try:
+    import faiss
+except ImportError:  # pragma: no cover - dependência opcional
+    faiss = None
+
+
+def quantize_embeddings(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Quantiza embeddings para int8 com uma escala por vetor.
+
+    Args:
+        vectors: Matriz float32 com um embedding por linha
+
+    Returns:
+        Tupla (vetores int8, escalas float32) tal que vetor ≈ int8 * escala
+    """
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    quantized = np.round(vectors / scales[:, None]).astype(np.int8)
+    return quantized, scales.astype(np.float32)
+
+
+def decode_embedding(stored: dict) -> np.ndarray:
+    """
+    Converte o embedding gravado (int8 + escala ou lista de floats) em float32.
+
+    Args:
+        stored: Documento do MongoDB com os campos "embedding" e "scale"
+
+    Returns:
+        Vetor float32
+    """
+    embedding = stored["embedding"]
+    if isinstance(embedding, bytes):
+        return np.frombuffer(embedding, dtype=np.int8).astype(np.float32) * stored.get("scale", 1.0)
+    return np.asarray(embedding, dtype=np.float32)
+
+
+class _EmbeddingMatrix:
+    """Cópia em memória dos embeddings de uma coleção para busca no cliente."""
+
+    def __init__(
+        self,
+        ids: List[str],
+        contents: List[str],
+        metadatas: List[dict],
+        matrix: np.ndarray,
+        faiss_min_vectors: int = 10000,
+    ):
+        """
+        Inicializa a matriz de embeddings.
+
+        Args:
+            ids: IDs dos documentos, na ordem das linhas
+            contents: Conteúdo dos documentos
+            metadatas: Metadados dos documentos
+            matrix: Embeddings normalizados (float32, uma linha por documento)
+            faiss_min_vectors: A partir deste tamanho usa um índice HNSW do FAISS
+        """
+        self.ids = ids
+        self.contents = contents
+        self.metadatas = metadatas
+        # Linhas [0, len(ids)) em uso; a capacidade dobra quando enche, para
+        # que cada append copie só as linhas novas. Sem dimensão conhecida
+        # (coleção vazia), fica None até o primeiro append.
+        self._buffer = matrix if len(ids) else None
+        self.faiss_min_vectors = faiss_min_vectors
+        self.index = None
+        # Serializa append e search: o índice HNSW não suporta add/search simultâneos
+        self._lock = threading.Lock()
+        self._maybe_build_index()
+
+    @property
+    def matrix(self) -> Optional[np.ndarray]:
+        """Embeddings em uso; None depois que o índice HNSW passa a guardá-los."""
+        if self._buffer is None:
+            return None
+        return self._buffer[:len(self.ids)]
+
+    def _maybe_build_index(self):
+        """Cria o índice HNSW quando o FAISS está disponível e a coleção é grande."""
+        if faiss is None or self.index is not None:
+            return
+        if len(self.ids) < self.faiss_min_vectors:
+            return
+
+        matrix = self.matrix
+        self.index = faiss.IndexHNSWFlat(matrix.shape[1], 32, faiss.METRIC_INNER_PRODUCT)
+        self.index.add(matrix)
+        # O índice guarda sua própria cópia dos vetores
+        self._buffer = None
+
+    def _reserve(self, rows: int, dim: int):
+        """Garante espaço no buffer para mais rows linhas."""
+        used = len(self.ids)
+        capacity = 0 if self._buffer is None else len(self._buffer)
+        if used + rows <= capacity:
+            return
+
+        buffer = np.empty((max(2 * capacity, used + rows), dim), dtype=np.float32)
+        if used:
+            buffer[:used] = self._buffer[:used]
+        self._buffer = buffer
+
+    def append(self, ids: List[str], contents: List[str], metadatas: List[dict], rows: np.ndarray):
+        """Acrescenta documentos recém-inseridos sem recarregar a coleção."""
+        rows = np.ascontiguousarray(rows, dtype=np.float32)
+        with self._lock:
+            if self.index is None:
+                self._reserve(len(rows), rows.shape[1])
+                used = len(self.ids)
+                self._buffer[used:used + len(rows)] = rows
+            else:
+                self.index.add(rows)
+
+            self.ids.extend(ids)
+            self.contents.extend(contents)
+            self.metadatas.extend(metadatas)
+            self._maybe_build_index()
+
+    def search(self, query_embedding: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Retorna as posições e scores dos documentos mais similares.
+
+        Args:
+            query_embedding: Embedding normalizado da query
+            top_k: Número de resultados
+
+        Returns:
+            Tupla (posições, scores) ordenada por relevância
+        """
+        with self._lock:
+            k = min(top_k, len(self.ids))
+
+            if self.index is not None:
+                self.index.hnsw.efSearch = max(64, k)
+                scores, positions = self.index.search(query_embedding[None, :], k)
+                found = positions[0] >= 0
+                return positions[0][found], scores[0][found]
+
+            scores = cosine_scores(self.matrix, query_embedding)
+            top = top_k_indices(scores, k)
+            return top, scores[top]
 
 
 class MongoDBAdapter(VectorStoreAdapter):
@@ -12,7 +167,11 @@ class MongoDBAdapter(VectorStoreAdapter):
         self,
         connection_string: str,
         database_name: str = "rag_system",
-        model_name: str = "all-MiniLM-L6-v2"
+        model_name: str = "all-MiniLM-L6-v2",
+        device: str = "auto",
+        vector_index: str = "",
+        faiss_min_vectors: int = 10000,
+        store_int8: bool = True
     ):
         """
         Inicializa o adaptador MongoDB.
@@ -21,107 +180,258 @@ class MongoDBAdapter(VectorStoreAdapter):
             connection_string: String de conexão MongoDB
             database_name: Nome do banco de dados
             model_name: Modelo de embeddings do Sentence Transformers
+            device: Dispositivo do modelo de embeddings (auto, cpu, cuda)
+            vector_index: Nome do índice do Atlas Vector Search. Se vazio,
+                a busca é feita no cliente sobre uma matriz em memória
+            faiss_min_vectors: Tamanho mínimo da coleção para a busca local
+                usar um índice HNSW do FAISS (se instalado)
+            store_int8: Grava os embeddings como int8 + escala
+                (ignorado com Atlas Vector Search, que exige floats)
         """
         self.client = MongoClient(connection_string)
         self.db = self.client[database_name]
-        self.embedding_model = SentenceTransformer(model_name)
+        self.embedding_model = get_embedder(model_name, device)
+        self.vector_index = vector_index
+        self.faiss_min_vectors = faiss_min_vectors
+        self.store_int8 = store_int8 and not vector_index
+        self._matrices: Dict[str, _EmbeddingMatrix] = {}
+        # Protegem _matrices contra buscas que carregam a matriz em paralelo
+        # com escritas: cada escrita incrementa a geração da coleção, e uma
+        # matriz lida sob outra geração (ou durante uma escrita) não é guardada
+        self._matrices_lock = threading.Lock()
+        self._generations: Dict[str, int] = {}
+        self._writes_in_flight: Dict[str, int] = {}
+
+    def _begin_write(self, collection_name: str):
+        """Marca o início de uma escrita na coleção."""
+        with self._matrices_lock:
+            self._generations[collection_name] = self._generations.get(collection_name, 0) + 1
+            self._writes_in_flight[collection_name] = self._writes_in_flight.get(collection_name, 0) + 1
 
-    async def add_documents(self, documents: List[Document], collection_name: str) -> List[str]:
+    def _end_write(self, collection_name: str, appended: Optional[tuple] = None):
+        """
+        Marca o fim de uma escrita, atualizando a matriz em memória.
+
+        Args:
+            collection_name: Nome da coleção
+            appended: (ids, conteúdos, metadados, embeddings) inseridos; sem
+                eles (remoção ou falha), a matriz é recarregada na próxima busca
+        """
+        with self._matrices_lock:
+            self._writes_in_flight[collection_name] -= 1
+            if not self._writes_in_flight[collection_name]:
+                del self._writes_in_flight[collection_name]
+
+            if appended is None:
+                self._matrices.pop(collection_name, None)
+                return
+
+            # Uma matriz guardada foi lida antes desta escrita começar
+            cached = self._matrices.get(collection_name)
+            if cached is not None:
+                cached.append(*appended)
+
+    def _load_matrix(self, collection_name: str) -> _EmbeddingMatrix:
+        """
+        Carrega (uma vez) os embeddings da coleção como matriz float32.
+
+        Args:
+            collection_name: Nome da coleção
+
+        Returns:
+            Matriz de embeddings com as linhas normalizadas
+        """
+        with self._matrices_lock:
+            cached = self._matrices.get(collection_name)
+            if cached is not None:
+                return cached
+            generation = self._generations.get(collection_name, 0)
+            writing = collection_name in self._writes_in_flight
+
+        cursor = self.db[collection_name].find(
+            {}, {"embedding": 1, "scale": 1, "content": 1, "metadata": 1}
+        )
+        ids, contents, metadatas, rows = [], [], [], []
+        for doc in cursor:
+            ids.append(doc["_id"])
+            contents.append(doc.get("content", ""))
+            metadatas.append(doc.get("metadata", {}))
+            rows.append(decode_embedding(doc))
+
+        matrix = np.vstack(rows) if rows else np.empty((0,), dtype=np.float32)
+        if len(rows):
+            # Normalizar uma única vez: a busca vira um produto escalar
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            matrix /= np.maximum(norms, 1e-12)
+
+        cached = _EmbeddingMatrix(
+            ids, contents, metadatas, matrix, self.faiss_min_vectors
+        )
+        with self._matrices_lock:
+            # Uma escrita simultânea à leitura pode ter ficado de fora (ou
+            # entrado pela metade): usar a matriz nesta busca, sem guardá-la
+            if writing or self._generations.get(collection_name, 0) != generation:
+                return cached
+            return self._matrices.setdefault(collection_name, cached)
+
+    def _embedding_fields(self, embeddings: np.ndarray) -> List[dict]:
+        """Campos de cada documento MongoDB que armazenam o embedding."""
+        if not self.store_int8:
+            return [{"embedding": embedding.tolist()} for embedding in embeddings]
+
+        quantized, scales = quantize_embeddings(embeddings)
+        return [
+            {"embedding": Binary(row.tobytes()), "scale": float(scale)}
+            for row, scale in zip(quantized, scales)
+        ]
+
+    @staticmethod
+    def _existing_ids(collection, ids: List[str]) -> set:
+        """IDs da lista que já estão gravados na coleção."""
+        return {
+            stored["_id"]
+            for stored in collection.find({"_id": {"$in": ids}}, {"_id": 1})
+        }
+
+    def _search_atlas(self, collection, query_embedding: np.ndarray, top_k: int) -> List[SearchResult]:
+        """Busca usando o estágio $vectorSearch do Atlas Vector Search."""
+        pipeline = [
+            {
+                "$vectorSearch": {
+                    "index": self.vector_index,
+                    "path": "embedding",
+                    "queryVector": query_embedding.tolist(),
+                    "numCandidates": top_k * 10,
+                    "limit": top_k
+                }
+            },
+            {
+                "$project": {
+                    "content": 1,
+                    "metadata": 1,
+                    "score": {"$meta": "vectorSearchScore"}
+                }
+            }
+        ]
+
+        return [
+            SearchResult(
+                content=result.get("content", ""),
+                score=float(result.get("score", 0)),
+                metadata=result.get("metadata", {})
+            )
+            for result in collection.aggregate(pipeline)
+        ]
+
+    def _search_local(self, collection_name: str, query_embedding: np.ndarray, top_k: int) -> List[SearchResult]:
+        """Busca por similaridade de cosseno sobre a matriz em memória."""
+        cached = self._load_matrix(collection_name)
+        if not cached.ids:
+            return []
+
+        positions, scores = cached.search(query_embedding, top_k)
+
+        return [
+            SearchResult(
+                content=cached.contents[i],
+                score=float(score),
+                metadata=cached.metadatas[i]
+            )
+            for i, score in zip(positions, scores)
+        ]
+
+    async def add_documents(
+        self,
+        documents: List[Document],
+        collection_name: str,
+        batch_size: Optional[int] = None,
+    ) -> List[str]:
         """Adiciona documentos ao MongoDB."""
         try:
             collection = self.db[collection_name]
 
-            # Gerar embeddings
-            texts = [doc.content for doc in documents]
-            embeddings = self.embedding_model.encode(
-                texts, convert_to_tensor=False).tolist()
+            ids = [doc.doc_id or content_hash_id(doc.content) for doc in documents]
 
-            # Preparar documentos
-            documents_to_insert = []
-            ids = []
+            # Reingestão idempotente: não gera embeddings para IDs já gravados
+            existing = await asyncio.to_thread(self._existing_ids, collection, ids)
+            pending = {}
+            for doc_id, doc in zip(ids, documents):
+                if doc_id not in existing:
+                    pending.setdefault(doc_id, doc)
 
-            for doc, embedding in zip(documents, embeddings):
-                doc_id = doc.doc_id or f"doc_{len(documents_to_insert)}"
-                ids.append(doc_id)
+            if not pending:
+                return ids
 
-                documents_to_insert.append({
+            # Gerar embeddings
+            pending_ids = list(pending)
+            pending_docs = list(pending.values())
+            texts = [doc.content for doc in pending_docs]
+            metadatas = [doc.to_metadata() for doc in pending_docs]
+            embeddings = await asyncio.to_thread(
+                self.embedding_model.encode, texts, batch_size
+            )
+
+            # Preparar operações
+            operations = [
+                InsertOne({
                     "_id": doc_id,
-                    "content": doc.content,
-                    "embedding": embedding,
-                    "metadata": doc.metadata
+                    "content": content,
+                    "metadata": metadata,
+                    **fields
                 })
+                for doc_id, content, metadata, fields in zip(
+                    pending_ids, texts, metadatas, self._embedding_fields(embeddings)
+                )
+            ]
 
-            # Inserir no MongoDB
-            if documents_to_insert:
-                collection.insert_many(documents_to_insert, ordered=False)
+            # Inserir no MongoDB em uma única ida ao servidor
+            appended = None
+            self._begin_write(collection_name)
+            try:
+                await asyncio.to_thread(
+                    collection.bulk_write, operations, ordered=False
+                )
+                appended = (pending_ids, texts, metadatas, embeddings)
+            except BulkWriteError as e:
+                # Inserção parcial: a matriz é recarregada na próxima busca
+                errors = e.details.get("writeErrors", [])
+                if any(error["code"] != DUPLICATE_KEY_ERROR for error in errors):
+                    raise
+            finally:
+                await asyncio.to_thread(self._end_write, collection_name, appended)
 
             return ids
-        except Exception as e:
-            print(f"Erro ao adicionar documentos no MongoDB: {str(e)}")
+        except Exception:
+            logger.exception("Erro ao adicionar documentos no MongoDB (coleção %s)", collection_name)
             raise
 
-    async def search(self, query: str, collection_name: str, top_k: int = 5) -> List[SearchResult]:
+    async def search(
+        self,
+        query: str,
+        collection_name: str,
+        top_k: int = 5,
+        query_embedding: Optional[np.ndarray] = None
+    ) -> List[SearchResult]:
         """Busca documentos similares no MongoDB usando vector search."""
         try:
             collection = self.db[collection_name]
 
-            # Gerar embedding da query
-            query_embedding = self.embedding_model.encode(
-                [query], convert_to_tensor=False).tolist()[0]
-
-            # Buscar usando aggregation pipeline com $search (requer Atlas Vector Search)
-            # Se não tiver Atlas Vector Search, usa busca aproximada com score calculado
-            pipeline = [
-                {
-                    "$addFields": {
-                        "similarity": {
-                            "$divide": [
-                                {"$reduce": {
-                                    "input": {"$zip": {
-                                        "inputs": ["$embedding", query_embedding]
-                                    }},
-                                    "initialValue": 0,
-                                    "in": {"$add": [
-                                        "$$value",
-                                        {"$multiply": [
-                                            {"$arrayElemAt": ["$$this", 0]},
-                                            {"$arrayElemAt": ["$$this", 1]}
-                                        ]}
-                                    ]}
-                                }},
-                                {
-                                    "$sqrt": {
-                                        "$reduce": {
-                                            "input": "$embedding",
-                                            "initialValue": 0,
-                                            "in": {"$add": ["$$value", {"$pow": ["$$this", 2]}]}
-                                        }
-                                    }
-                                }
-                            ]
-                        }
-                    }
-                },
-                {"$sort": {"similarity": -1}},
-                {"$limit": top_k}
-            ]
+            # Gerar embedding da query (se o chamador não o forneceu)
+            if query_embedding is None:
+                query_embedding = await asyncio.to_thread(
+                    self.embedding_model.encode_query, query
+                )
 
-            results = list(collection.aggregate(pipeline))
-
-            # Converter para SearchResult
-            search_results = []
-            for result in results:
-                search_results.append(
-                    SearchResult(
-                        content=result.get("content", ""),
-                        score=result.get("similarity", 0),
-                        metadata=result.get("metadata", {})
-                    )
+            if self.vector_index:
+                return await asyncio.to_thread(
+                    self._search_atlas, collection, query_embedding, top_k
                 )
 
-            return search_results
-        except Exception as e:
-            print(f"Erro ao buscar no MongoDB: {str(e)}")
+            return await asyncio.to_thread(
+                self._search_local, collection_name, query_embedding, top_k
+            )
+        except Exception:
+            logger.exception("Erro ao buscar no MongoDB (coleção %s)", collection_name)
             # Fallback: retornar busca simples se vector search não funcionar
             return []
 
@@ -129,25 +439,35 @@ class MongoDBAdapter(VectorStoreAdapter):
         """Remove documentos do MongoDB."""
         try:
             collection = self.db[collection_name]
-            result = collection.delete_many({"_id": {"$in": doc_ids}})
+            self._begin_write(collection_name)
+            try:
+                result = await asyncio.to_thread(
+                    collection.delete_many, {"_id": {"$in": doc_ids}}
+                )
+            finally:
+                self._end_write(collection_name)
             return result.deleted_count > 0
-        except Exception as e:
-            print(f"Erro ao deletar documentos no MongoDB: {str(e)}")
+        except Exception:
+            logger.exception("Erro ao deletar documentos no MongoDB (coleção %s)", collection_name)
             return False
 
     async def delete_collection(self, collection_name: str) -> bool:
         """Remove uma coleção do MongoDB."""
         try:
-            self.db[collection_name].drop()
+            self._begin_write(collection_name)
+            try:
+                await asyncio.to_thread(self.db[collection_name].drop)
+            finally:
+                self._end_write(collection_name)
             return True
-        except Exception as e:
-            print(f"Erro ao deletar coleção no MongoDB: {str(e)}")
+        except Exception:
+            logger.exception("Erro ao deletar coleção %s no MongoDB", collection_name)
             return False
 
     async def health_check(self) -> bool:
         """Verifica a saúde da conexão com MongoDB."""
         try:
-            self.client.admin.command("ping")
+            await asyncio.to_thread(self.client.admin.command, "ping")
             return True
         except ConnectionFailure:
             return False
@@ -1,14 +1,32 @@
-from typing import List
-from app.core.vector_store import VectorStoreAdapter, Document, SearchResult
-from sentence_transformers import SentenceTransformer
-from pinecone import Pinecone, ServerlessSpec
-import time
+import asyncio
+import functools
+import logging
+import re
+from typing import Dict, List, Optional
+import numpy as np
+from app.core.vector_store import VectorStoreAdapter, Document, SearchResult, content_hash_id
+from app.core.embeddings import get_embedder
+from pinecone import Index, Pinecone, ServerlessSpec
+
+logger = logging.getLogger(__name__)
+
+_INDEX_NAME_RE = re.compile(r"[a-z0-9-]*")
 
 
 class PineconeAdapter(VectorStoreAdapter):
     """Adaptador para Pinecone v3.0+ como banco vetorial."""
 
-    def __init__(self, api_key: str, cloud: str = "aws", region: str = "us-east-1", model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(
+        self,
+        api_key: str,
+        cloud: str = "aws",
+        region: str = "us-east-1",
+        model_name: str = "all-MiniLM-L6-v2",
+        device: str = "auto",
+        upsert_batch_size: int = 100,
+        upsert_concurrency: int = 8,
+        index_ready_timeout: float = 60.0
+    ):
         """
         Inicializa o adaptador Pinecone v3.0+.
 
@@ -17,14 +35,24 @@ class PineconeAdapter(VectorStoreAdapter):
             cloud: Provedor cloud (aws, gcp, azure)
             region: Região (ex: us-east-1)
             model_name: Modelo de embeddings do Sentence Transformers
+            device: Dispositivo do modelo de embeddings (auto, cpu, cuda)
+            upsert_batch_size: Registros por chamada de upsert
+            upsert_concurrency: Máximo de upserts em paralelo
+            index_ready_timeout: Tempo máximo (s) aguardando um índice novo
         """
-        self.embedding_model = SentenceTransformer(model_name)
+        self.embedding_model = get_embedder(model_name, device)
         self.pc = Pinecone(api_key=api_key)
         self.cloud = cloud
         self.region = region
+        self.upsert_batch_size = upsert_batch_size
+        self.upsert_concurrency = upsert_concurrency
+        self.index_ready_timeout = index_ready_timeout
         self.namespace = "documents"  # Namespace padrão para documentos
+        self._indexes: Dict[str, Index] = {}
 
-    def _validate_index_name(self, index_name: str) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _validate_index_name(index_name: str) -> str:
         """
         Valida o nome do índice para ser compatível com Pinecone.
 
@@ -67,9 +95,9 @@ class PineconeAdapter(VectorStoreAdapter):
         validated = index_name.lower()
 
         # Verificar se tem caracteres especiais (exceto hífens)
-        if not all(c.isalnum() or c == "-" for c in validated):
+        if not _INDEX_NAME_RE.fullmatch(validated):
             special_chars = "".join(
-                set(c for c in validated if not (c.isalnum() or c == "-")))
+                set(c for c in validated if not _INDEX_NAME_RE.fullmatch(c)))
             raise ValueError(
                 f"❌ Nome de coleção inválido: '{index_name}'\n"
                 f"Pinecone não aceita caracteres especiais: {special_chars}\n"
@@ -78,96 +106,154 @@ class PineconeAdapter(VectorStoreAdapter):
 
         return validated
 
-    def _ensure_index_exists(self, index_name: str):
+    async def _get_index(self, index_name: str) -> Optional[Index]:
         """
-        Verifica e cria o índice se necessário.
+        Retorna o handle do índice, consultando o Pinecone só na primeira vez.
 
         Args:
             index_name: Nome do índice (já validado)
+
+        Returns:
+            Handle do índice ou None se ele não existir
         """
-        if not self.pc.has_index(index_name):
-            # Criar índice serverless com dimensão apropriada
-            self.pc.create_index(
-                name=index_name,
-                dimension=384,  # Dimensão do modelo all-MiniLM-L6-v2
-                metric="cosine",
-                spec=ServerlessSpec(cloud=self.cloud, region=self.region)
-            )
-            # Aguardar índice ficar pronto
-            time.sleep(2)
+        index = self._indexes.get(index_name)
+        if index is None:
+            if not await asyncio.to_thread(self.pc.has_index, index_name):
+                return None
+            index = await asyncio.to_thread(self.pc.Index, index_name)
+            self._indexes[index_name] = index
+        return index
+
+    async def _ensure_index_exists(self, index_name: str):
+        """
+        Verifica e cria o índice se necessário, aguardando até ficar pronto.
 
-    async def add_documents(self, documents: List[Document], collection_name: str) -> List[str]:
+        Args:
+            index_name: Nome do índice (já validado)
+
+        Raises:
+            TimeoutError: Se o índice não ficar pronto dentro do prazo
+        """
+        if index_name in self._indexes:
+            return
+        if await asyncio.to_thread(self.pc.has_index, index_name):
+            return
+
+        # Criar índice serverless com a dimensão do modelo de embeddings
+        await asyncio.to_thread(
+            self.pc.create_index,
+            name=index_name,
+            dimension=self.embedding_model.dimension,
+            metric="cosine",
+            spec=ServerlessSpec(cloud=self.cloud, region=self.region)
+        )
+
+        # Aguardar índice ficar pronto sem bloquear o event loop
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.index_ready_timeout
+        while True:
+            description = await asyncio.to_thread(self.pc.describe_index, index_name)
+            if description.status["ready"]:
+                return
+            if loop.time() >= deadline:
+                raise TimeoutError(
+                    f"Índice '{index_name}' não ficou pronto em "
+                    f"{self.index_ready_timeout}s"
+                )
+            await asyncio.sleep(0.2)
+
+    async def add_documents(
+        self,
+        documents: List[Document],
+        collection_name: str,
+        batch_size: Optional[int] = None,
+    ) -> List[str]:
         """Adiciona documentos ao Pinecone."""
         try:
             # Validar nome da coleção
             collection_name = self._validate_index_name(collection_name)
 
             # Garantir que o índice existe
-            self._ensure_index_exists(collection_name)
+            await self._ensure_index_exists(collection_name)
 
             # Obter índice
-            index = self.pc.Index(collection_name)
+            index = await self._get_index(collection_name)
 
             # Gerar embeddings
             texts = [doc.content for doc in documents]
-            embeddings = self.embedding_model.encode(
-                texts, convert_to_tensor=False
+            embeddings = await asyncio.to_thread(
+                self.embedding_model.encode, texts, batch_size
             )
 
-            # Preparar dados para upsert
-            records_to_upsert = []
-            ids = []
+            ids = [doc.doc_id or content_hash_id(doc.content) for doc in documents]
+            upsert_batch_size = self.upsert_batch_size
+
+            def upsert_range(start: int):
+                # Converte para listas Python apenas as linhas deste batch
+                stop = start + upsert_batch_size
+                vectors = [
+                    {
+                        "id": doc_id,
+                        "values": values,
+                        "metadata": {
+                            "content": doc.content,
+                            **doc.to_metadata()
+                        }
+                    }
+                    for doc_id, doc, values in zip(
+                        ids[start:stop],
+                        documents[start:stop],
+                        embeddings[start:stop].tolist()
+                    )
+                ]
+                index.upsert(vectors=vectors, namespace=self.namespace)
 
-            for i, (doc, embedding) in enumerate(zip(documents, embeddings)):
-                doc_id = doc.doc_id or f"doc_{i}"
-                ids.append(doc_id)
+            # Upsert em batches concorrentes, limitados por semáforo
+            semaphore = asyncio.Semaphore(self.upsert_concurrency)
 
-                record = {
-                    "id": doc_id,
-                    "values": embedding.tolist() if hasattr(embedding, 'tolist') else embedding,
-                    "metadata": {
-                        "content": doc.content,
-                        **doc.metadata
-                    }
-                }
-                records_to_upsert.append(record)
-
-            # Upsert em batches de 100 registros
-            batch_size = 100
-            for i in range(0, len(records_to_upsert), batch_size):
-                batch = records_to_upsert[i:i + batch_size]
-                index.upsert(
-                    vectors=batch,
-                    namespace=self.namespace
-                )
+            async def upsert_batch(start: int):
+                async with semaphore:
+                    await asyncio.to_thread(upsert_range, start)
+
+            await asyncio.gather(*[
+                upsert_batch(start)
+                for start in range(0, len(documents), upsert_batch_size)
+            ])
 
             return ids
 
-        except Exception as e:
-            print(f"Erro ao adicionar documentos no Pinecone: {str(e)}")
+        except Exception:
+            logger.exception("Erro ao adicionar documentos no Pinecone (coleção %s)", collection_name)
             raise
 
-    async def search(self, query: str, collection_name: str, top_k: int = 5) -> List[SearchResult]:
+    async def search(
+        self,
+        query: str,
+        collection_name: str,
+        top_k: int = 5,
+        query_embedding: Optional[np.ndarray] = None
+    ) -> List[SearchResult]:
         """Busca documentos similares no Pinecone."""
         try:
             # Validar nome da coleção
             collection_name = self._validate_index_name(collection_name)
 
             # Verificar se índice existe
-            if not self.pc.has_index(collection_name):
+            index = await self._get_index(collection_name)
+            if index is None:
                 return []
 
-            index = self.pc.Index(collection_name)
-
-            # Gerar embedding da query
-            query_embedding = self.embedding_model.encode(
-                [query], convert_to_tensor=False)[0]
+            # Gerar embedding da query (se o chamador não o forneceu)
+            if query_embedding is None:
+                query_embedding = await asyncio.to_thread(
+                    self.embedding_model.encode_query, query
+                )
 
             # Buscar
-            results = index.query(
+            results = await asyncio.to_thread(
+                index.query,
                 namespace=self.namespace,
-                vector=query_embedding.tolist() if hasattr(
-                    query_embedding, 'tolist') else query_embedding,
+                vector=query_embedding.tolist(),
                 top_k=top_k,
                 include_metadata=True
             )
@@ -186,15 +272,15 @@ class PineconeAdapter(VectorStoreAdapter):
                 search_results.append(
                     SearchResult(
                         content=content,
-                        score=match.score,
+                        score=float(match.score),
                         metadata=metadata
                     )
                 )
 
             return search_results
 
-        except Exception as e:
-            print(f"Erro ao buscar no Pinecone: {str(e)}")
+        except Exception:
+            logger.exception("Erro ao buscar no Pinecone (coleção %s)", collection_name)
             raise
 
     async def delete_documents(self, doc_ids: List[str], collection_name: str) -> bool:
@@ -203,15 +289,17 @@ class PineconeAdapter(VectorStoreAdapter):
             # Validar nome da coleção
             collection_name = self._validate_index_name(collection_name)
 
-            if not self.pc.has_index(collection_name):
+            index = await self._get_index(collection_name)
+            if index is None:
                 return False
 
-            index = self.pc.Index(collection_name)
-            index.delete(ids=doc_ids, namespace=self.namespace)
+            await asyncio.to_thread(
+                index.delete, ids=doc_ids, namespace=self.namespace
+            )
             return True
 
-        except Exception as e:
-            print(f"Erro ao deletar documentos no Pinecone: {str(e)}")
+        except Exception:
+            logger.exception("Erro ao deletar documentos no Pinecone (coleção %s)", collection_name)
             return False
 
     async def delete_collection(self, collection_name: str) -> bool:
@@ -220,19 +308,20 @@ class PineconeAdapter(VectorStoreAdapter):
             # Validar nome da coleção
             collection_name = self._validate_index_name(collection_name)
 
-            if self.pc.has_index(collection_name):
-                self.pc.delete_index(collection_name)
+            self._indexes.pop(collection_name, None)
+            if await asyncio.to_thread(self.pc.has_index, collection_name):
+                await asyncio.to_thread(self.pc.delete_index, collection_name)
             return True
 
-        except Exception as e:
-            print(f"Erro ao deletar índice no Pinecone: {str(e)}")
+        except Exception:
+            logger.exception("Erro ao deletar índice %s no Pinecone", collection_name)
             return False
 
     async def health_check(self) -> bool:
         """Verifica a saúde da conexão com Pinecone."""
         try:
             # Tentar listar índices como teste de conexão
-            self.pc.list_indexes()
+            await asyncio.to_thread(self.pc.list_indexes)
             return True
         except Exception:
             return False
@@ -1,7 +1,21 @@
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, status
+from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException, Query, Response, status
+from pydantic import TypeAdapter
 from typing import Optional
+import asyncio
+import os
 import uuid
-from app.core import PDFProcessor, VectorStoreFactory, settings
+from app.core import (
+    PDFProcessor,
+    SearchResultCache,
+    SemanticQueryCache,
+    VectorStoreAdapter,
+    embed_query,
+    get_pdf_processor,
+    get_query_cache,
+    get_search_cache,
+    get_vector_store,
+    settings,
+)
 from app.schemas import (
     DocumentUploadResponse,
     SearchQuery,
@@ -12,12 +26,8 @@ from app.schemas import (
 
 router = APIRouter(prefix="/api/v1", tags=["RAG Operations"])
 
-# Instâncias globais
-pdf_processor = PDFProcessor(
-    chunk_size=settings.PDF_CHUNK_SIZE,
-    chunk_overlap=settings.PDF_CHUNK_OVERLAP,
-)
-vector_store = VectorStoreFactory.create_vector_store()
+# Serializador pré-compilado da resposta de busca (evita o jsonable_encoder)
+_SEARCH_RESPONSE_ADAPTER = TypeAdapter(SearchResponse)
 
 
 @router.post(
@@ -32,6 +42,10 @@ async def upload_document(
                                 description="Coleção para armazenar o documento"),
     metadata: Optional[str] = Form(
         None, description="JSON string com metadados adicionais"),
+    pdf_processor: PDFProcessor = Depends(get_pdf_processor),
+    vector_store: VectorStoreAdapter = Depends(get_vector_store),
+    query_cache: SemanticQueryCache = Depends(get_query_cache),
+    search_cache: SearchResultCache = Depends(get_search_cache),
 ):
     """
     Endpoint para upload de PDFs.
@@ -50,12 +64,12 @@ async def upload_document(
                 detail="Apenas arquivos PDF são aceitos"
             )
 
-        # Ler arquivo
-        file_content = await file.read()
-
-        # Validar tamanho
+        # Validar tamanho sem trazer o arquivo para a memória
         max_size = settings.MAX_PDF_SIZE_MB * 1024 * 1024
-        if len(file_content) > max_size:
+        size = file.size
+        if size is None:
+            size = await asyncio.to_thread(file.file.seek, 0, os.SEEK_END)
+        if size > max_size:
             raise HTTPException(
                 status_code=status.HTTP_413_PAYLOAD_TOO_LARGE,
                 detail=f"Arquivo muito grande. Máximo: {settings.MAX_PDF_SIZE_MB}MB"
@@ -64,22 +78,27 @@ async def upload_document(
         # Gerar ID único para o documento
         document_id = str(uuid.uuid4())
 
-        # Processar PDF
-        documents = await pdf_processor.process_pdf(
-            file_content=file_content,
-            filename=file.filename,
-            document_id=document_id,
-        )
+        # Processar o PDF em streaming direto do arquivo temporário do upload,
+        # gravando os chunks no vector store em lotes
+        try:
+            chunk_ids = await pdf_processor.ingest(
+                file=file.file,
+                filename=file.filename,
+                document_id=document_id,
+                vector_store=vector_store,
+                collection_name=collection_name,
+            )
+        finally:
+            # Lotes gravados antes de uma falha podem ter entrado no cache
+            query_cache.invalidate(collection_name)
+            search_cache.invalidate(collection_name)
 
-        if not documents:
+        if not chunk_ids:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Nenhum conteúdo extraível encontrado no PDF"
             )
 
-        # Adicionar ao vector store
-        chunk_ids = await vector_store.add_documents(documents, collection_name)
-
         return DocumentUploadResponse(
             document_id=document_id,
             filename=file.filename,
@@ -109,13 +128,20 @@ async def upload_document(
     summary="Buscar Documentos",
     description="Busca documentos similares usando embeddings"
 )
-async def search_documents(query_request: SearchQuery):
+async def search_documents(
+    query_request: SearchQuery,
+    no_cache: bool = Query(False, description="Ignora os caches de busca (debug)"),
+    vector_store: VectorStoreAdapter = Depends(get_vector_store),
+    query_cache: SemanticQueryCache = Depends(get_query_cache),
+    search_cache: SearchResultCache = Depends(get_search_cache),
+):
     """
     Endpoint para buscar documentos similares.
 
     - **query**: Texto para buscar
     - **collection_name**: Coleção onde buscar
     - **top_k**: Número máximo de resultados (padrão: 5)
+    - **no_cache**: Ignora os caches de busca (query string)
 
     Retorna os documentos mais similares ordenados por relevância.
     """
@@ -127,29 +153,80 @@ async def search_documents(query_request: SearchQuery):
                 detail="Nome da coleção é obrigatório"
             )
 
-        # Buscar documentos
-        results = await vector_store.search(
-            query=query_request.query,
-            collection_name=query_request.collection_name,
-            top_k=query_request.top_k
-        )
+        # Versões dos caches antes da busca: se um upload ou remoção invalidar
+        # a coleção durante a busca, o resultado não é guardado
+        query_cache_generation = query_cache.generation(query_request.collection_name)
+        search_cache_generation = search_cache.generation(query_request.collection_name)
 
-        # Converter para response format
-        search_results = [
-            SearchResultItem(
-                content=result.content,
-                score=result.score,
-                metadata=result.metadata
+        # Queries idênticas são respondidas direto do cache, sem embedding
+        search_results = None
+        if not no_cache:
+            search_results = search_cache.get(
+                query_request.query,
+                query_request.collection_name,
+                query_request.top_k
             )
-            for result in results
-        ]
 
-        return SearchResponse(
+        if search_results is None:
+            # Gerar o embedding da query uma única vez (memorizado por texto)
+            query_embedding = await asyncio.to_thread(
+                embed_query, query_request.query
+            )
+
+            # Buscar no cache semântico antes de ir ao vector store
+            results = None
+            if not no_cache:
+                results = query_cache.get(
+                    query_request.collection_name,
+                    query_embedding,
+                    query_request.top_k
+                )
+
+            if results is None:
+                results = await vector_store.search(
+                    query=query_request.query,
+                    collection_name=query_request.collection_name,
+                    top_k=query_request.top_k,
+                    query_embedding=query_embedding
+                )
+                if not no_cache:
+                    query_cache.put(
+                        query_request.collection_name,
+                        query_embedding,
+                        query_request.top_k,
+                        results,
+                        query_cache_generation
+                    )
+
+            # Converter para response format (itens imutáveis, reutilizáveis
+            # entre respostas)
+            search_results = [
+                SearchResultItem(
+                    content=result.content,
+                    score=result.score,
+                    metadata=result.metadata
+                )
+                for result in results
+            ]
+            if not no_cache:
+                search_cache.put(
+                    query_request.query,
+                    query_request.collection_name,
+                    query_request.top_k,
+                    search_results,
+                    search_cache_generation
+                )
+
+        response = SearchResponse(
             query=query_request.query,
             collection_name=query_request.collection_name,
             results=search_results,
             total_results=len(search_results)
         )
+        return Response(
+            content=_SEARCH_RESPONSE_ADAPTER.dump_json(response),
+            media_type="application/json"
+        )
 
     except HTTPException:
         raise
@@ -170,7 +247,12 @@ async def search_documents(query_request: SearchQuery):
     summary="Deletar Coleção",
     description="Remove uma coleção inteira e todos seus documentos"
 )
-async def delete_collection(collection_name: str):
+async def delete_collection(
+    collection_name: str,
+    vector_store: VectorStoreAdapter = Depends(get_vector_store),
+    query_cache: SemanticQueryCache = Depends(get_query_cache),
+    search_cache: SearchResultCache = Depends(get_search_cache),
+):
     """
     Endpoint para deletar uma coleção.
 
@@ -180,6 +262,8 @@ async def delete_collection(collection_name: str):
     """
     try:
         success = await vector_store.delete_collection(collection_name)
+        query_cache.invalidate(collection_name)
+        search_cache.invalidate(collection_name)
 
         if success:
             return {
@@ -1,16 +1,38 @@
 """__init__.py para o módulo core."""
 
 from app.core.config import settings, Settings
-from app.core.vector_store import VectorStoreAdapter, Document, SearchResult
+from app.core.vector_store import VectorStoreAdapter, ChunkMeta, Document, SearchResult, content_hash_id
+from app.core.text_splitter import TextSplitter
 from app.core.pdf_processor import PDFProcessor
+from app.core.embeddings import get_embedder, embed_query
+from app.core.query_cache import SearchResultCache, SemanticQueryCache
 from app.core.vector_store_factory import VectorStoreFactory
+from app.core.deps import (
+    get_vector_store,
+    get_pdf_extraction_pool,
+    get_pdf_processor,
+    get_query_cache,
+    get_search_cache,
+)
 
 __all__ = [
     "settings",
     "Settings",
     "VectorStoreAdapter",
+    "ChunkMeta",
     "Document",
     "SearchResult",
+    "content_hash_id",
+    "TextSplitter",
     "PDFProcessor",
+    "get_embedder",
+    "embed_query",
+    "SearchResultCache",
+    "SemanticQueryCache",
     "VectorStoreFactory",
+    "get_vector_store",
+    "get_pdf_extraction_pool",
+    "get_pdf_processor",
+    "get_query_cache",
+    "get_search_cache",
 ]
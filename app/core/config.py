@@ -12,6 +12,7 @@ class Settings(BaseSettings):
     HOST: str = "0.0.0.0"
     PORT: int = 8000
     DEBUG: bool = False
+    WORKERS: int = 1
 
     # Vector Store
     VECTOR_STORE_TYPE: Literal["chromadb", "pinecone", "mongodb"] = "chromadb"
@@ -23,17 +24,38 @@ class Settings(BaseSettings):
     PINECONE_API_KEY: str = ""
     PINECONE_CLOUD: str = "aws"
     PINECONE_REGION: str = "us-east-1"
+    PINECONE_UPSERT_BATCH_SIZE: int = 100
+    PINECONE_UPSERT_CONCURRENCY: int = 8
+    PINECONE_INDEX_READY_TIMEOUT: float = 60.0
 
     # MongoDB
     MONGODB_CONNECTION_STRING: str = "mongodb://localhost:27017"
     MONGODB_DATABASE_NAME: str = "rag_system"
+    MONGODB_VECTOR_INDEX: str = ""
+    MONGODB_FAISS_MIN_VECTORS: int = 10000
+    MONGODB_QUANTIZE_EMBEDDINGS: bool = True
 
     # Embeddings
     EMBEDDING_MODEL: str = "all-MiniLM-L6-v2"
+    EMBEDDING_DEVICE: str = "auto"
+    EMBEDDING_BATCH_SIZE: int = 64
+    EMBEDDING_AUTOCAST: bool = True
+    EMBEDDING_QUANTIZE: bool = False
+    EMBEDDING_CACHE_PATH: str = "./embedding_cache.sqlite3"
+    EMBEDDING_WORKERS: int = 0
+    EMBEDDING_POOL_MIN_TEXTS: int = 1000
+
+    # Cache semântico de buscas
+    QUERY_CACHE_SIZE: int = 256
+    QUERY_CACHE_THRESHOLD: float = 0.95
+    SEARCH_CACHE_SIZE: int = 1024
 
     # PDF Processing
     PDF_CHUNK_SIZE: int = 500
     PDF_CHUNK_OVERLAP: int = 50
+    PDF_PAGE_WINDOW: int = 50
+    PDF_INGEST_BATCH_SIZE: int = 128
+    PDF_EXTRACTION_WORKERS: int = 0
     MAX_PDF_SIZE_MB: int = 50
 
     class Config:
@@ -0,0 +1,45 @@
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from app.core.config import settings
+from app.core.vector_store import VectorStoreAdapter
+from app.core.pdf_processor import PDFProcessor, create_extraction_pool
+from app.core.query_cache import SearchResultCache, SemanticQueryCache
+from app.core.vector_store_factory import VectorStoreFactory
+
+
+def get_vector_store() -> VectorStoreAdapter:
+    """Vector store compartilhado pela aplicação (memorizado pela factory)."""
+    return VectorStoreFactory.create_vector_store()
+
+
+@lru_cache
+def get_pdf_extraction_pool() -> ProcessPoolExecutor:
+    """Pool de processos compartilhado para extração de texto dos PDFs."""
+    return create_extraction_pool(settings.PDF_EXTRACTION_WORKERS)
+
+
+@lru_cache
+def get_pdf_processor() -> PDFProcessor:
+    """Processador de PDFs compartilhado pela aplicação."""
+    return PDFProcessor(
+        chunk_size=settings.PDF_CHUNK_SIZE,
+        chunk_overlap=settings.PDF_CHUNK_OVERLAP,
+        page_window=settings.PDF_PAGE_WINDOW,
+        ingest_batch_size=settings.PDF_INGEST_BATCH_SIZE,
+        executor=get_pdf_extraction_pool(),
+    )
+
+
+@lru_cache
+def get_query_cache() -> SemanticQueryCache:
+    """Cache semântico de buscas compartilhado pela aplicação."""
+    return SemanticQueryCache(
+        max_entries=settings.QUERY_CACHE_SIZE,
+        threshold=settings.QUERY_CACHE_THRESHOLD,
+    )
+
+
+@lru_cache
+def get_search_cache() -> SearchResultCache:
+    """Cache de respostas por query exata compartilhado pela aplicação."""
+    return SearchResultCache(max_entries=settings.SEARCH_CACHE_SIZE)
@@ -0,0 +1,86 @@
+import hashlib
+import sqlite3
+import threading
+from typing import List, Optional
+import numpy as np
+
+# Limite conservador de parâmetros por consulta no SQLite
+_SQLITE_MAX_PARAMS = 500
+
+
+class EmbeddingCache:
+    """
+    Cache persistente de embeddings em SQLite, indexado pelo hash do texto.
+
+    Os vetores são gravados como bytes float32 brutos. O namespace separa
+    entradas de modelos/configurações diferentes no mesmo arquivo.
+    """
+
+    def __init__(self, path: str, namespace: str):
+        """
+        Inicializa o cache, criando a tabela se necessário.
+
+        Args:
+            path: Caminho do arquivo SQLite
+            namespace: Identifica o modelo que gerou os vetores
+        """
+        self.path = path
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "hash BLOB PRIMARY KEY, vector BLOB NOT NULL)"
+            )
+
+    def _key(self, text: str) -> bytes:
+        """Hash SHA-256 do texto dentro do namespace."""
+        return hashlib.sha256(f"{self.namespace}\0{text}".encode("utf-8")).digest()
+
+    def get_many(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """
+        Busca os embeddings dos textos no cache.
+
+        Args:
+            texts: Textos a consultar
+
+        Returns:
+            Lista alinhada com `texts`; None para textos ausentes do cache
+        """
+        keys = [self._key(text) for text in texts]
+        found = {}
+
+        with self._lock:
+            for start in range(0, len(keys), _SQLITE_MAX_PARAMS):
+                batch = keys[start:start + _SQLITE_MAX_PARAMS]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT hash, vector FROM embeddings WHERE hash IN ({placeholders})",
+                    batch,
+                )
+                found.update(rows)
+
+        return [
+            np.frombuffer(found[key], dtype=np.float32) if key in found else None
+            for key in keys
+        ]
+
+    def put_many(self, texts: List[str], vectors: np.ndarray):
+        """
+        Grava os embeddings dos textos no cache.
+
+        Args:
+            texts: Textos codificados
+            vectors: Matriz float32 com um embedding por linha
+        """
+        rows = [
+            (self._key(text), vector.astype(np.float32, copy=False).tobytes())
+            for text, vector in zip(texts, vectors)
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (hash, vector) VALUES (?, ?)",
+                rows,
+            )
@@ -0,0 +1,298 @@
+import functools
+import threading
+from typing import List, Optional
+import numpy as np
+import torch
+from sentence_transformers import SentenceTransformer
+from app.core.config import settings
+from app.core.embedding_cache import EmbeddingCache
+
+try:
+    import intel_extension_for_pytorch as ipex
+except ImportError:  # pragma: no cover - dependência opcional
+    ipex = None
+
+
+class Embedder:
+    """Encapsula o SentenceTransformer com os parâmetros de inferência do serviço."""
+
+    def __init__(
+        self,
+        model: SentenceTransformer,
+        batch_size: int = 64,
+        autocast: bool = True,
+        cache: Optional[EmbeddingCache] = None,
+        pool_cache: Optional[EmbeddingCache] = None,
+    ):
+        """
+        Inicializa o embedder.
+
+        Args:
+            model: Modelo do Sentence Transformers já carregado
+            batch_size: Tamanho do batch usado no encode
+            autocast: Executa a inferência em BF16 (CPU) ou FP16 (CUDA) no
+                processo principal; o pool de processos roda sem autocast
+            cache: Cache persistente consultado antes de rodar o modelo
+            pool_cache: Cache dos vetores gerados pelo pool de processos
+                (None usa o mesmo cache)
+        """
+        self.model = model
+        self.device = model.device.type
+        self.batch_size = batch_size
+        self.autocast = autocast
+        self.autocast_dtype = torch.bfloat16 if self.device == "cpu" else torch.float16
+        self.cache = cache
+        self.pool_cache = pool_cache or cache
+        self.pool = None
+        self.pool_min_texts = 0
+        self._pool_lock = threading.Lock()
+
+    @property
+    def dimension(self) -> int:
+        """Dimensão dos vetores gerados pelo modelo."""
+        return self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts: List[str], batch_size: Optional[int] = None) -> np.ndarray:
+        """
+        Gera embeddings normalizados (norma L2 = 1) para os textos.
+
+        Textos já presentes no cache persistente não passam pelo modelo.
+
+        Args:
+            texts: Textos a codificar
+            batch_size: Sobrescreve o tamanho de batch padrão
+
+        Returns:
+            Matriz float32 com um embedding por linha
+        """
+        use_pool = self.pool is not None and len(texts) >= self.pool_min_texts
+        # Vetores do pool e do processo principal podem ter precisões diferentes
+        cache = self.pool_cache if use_pool else self.cache
+        if cache is None:
+            return self._encode(texts, batch_size, use_pool)
+
+        cached = cache.get_many(texts)
+        missing = [i for i, vector in enumerate(cached) if vector is None]
+
+        embeddings = np.empty((len(texts), self.dimension), dtype=np.float32)
+        for i, vector in enumerate(cached):
+            if vector is not None:
+                embeddings[i] = vector
+
+        if missing:
+            missing_texts = [texts[i] for i in missing]
+            computed = self._encode(missing_texts, batch_size, use_pool)
+            embeddings[missing] = computed
+            cache.put_many(missing_texts, computed)
+
+        return embeddings
+
+    def encode_query(self, query: str) -> np.ndarray:
+        """
+        Gera o embedding normalizado de uma query de busca.
+
+        Queries não são gravadas no cache persistente para não poluí-lo.
+
+        Args:
+            query: Texto da busca
+
+        Returns:
+            Vetor float32 normalizado
+        """
+        return self._encode([query])[0]
+
+    def start_pool(self, workers: int, min_texts: int = 1000):
+        """
+        Inicia processos de encode para distribuir ingestões grandes pelos núcleos.
+
+        Args:
+            workers: Número de processos (cada um carrega uma cópia do modelo)
+            min_texts: Tamanho mínimo da entrada para usar o pool
+        """
+        if self.pool is not None or workers <= 0:
+            return
+        self.pool = self.model.start_multi_process_pool(
+            target_devices=[self.device] * workers
+        )
+        self.pool_min_texts = min_texts
+
+    def stop_pool(self):
+        """Encerra os processos de encode, se houver."""
+        if self.pool is None:
+            return
+        self.model.stop_multi_process_pool(self.pool)
+        self.pool = None
+
+    def warmup(self):
+        """
+        Executa o modelo uma vez para inicializar tokenizer e kernels.
+
+        Usa um texto curto e um longo para que os caminhos de sequências
+        curtas e longas já estejam prontos antes da primeira requisição.
+        """
+        self._encode(["warmup", " ".join(["warmup"] * 256)], batch_size=2)
+
+    def _encode(
+        self, texts: List[str], batch_size: Optional[int] = None, use_pool: bool = False
+    ) -> np.ndarray:
+        """Executa o modelo (ou o pool de processos) sobre os textos, ordenados por tamanho."""
+        if not texts:
+            return np.empty((0, self.dimension), dtype=np.float32)
+
+        # Ordenar por tamanho para que cada batch tenha comprimentos parecidos
+        # e o padding desperdice o mínimo de FLOPs; depois restaurar a ordem.
+        order = np.argsort([len(text) for text in texts], kind="stable")
+        inverse = np.argsort(order)
+
+        sorted_texts = [texts[i] for i in order]
+        batch_size = batch_size or self.batch_size
+
+        if use_pool:
+            # O pool tem uma única fila de resultados: uma chamada por vez
+            with self._pool_lock:
+                embeddings = self.model.encode(
+                    sorted_texts,
+                    pool=self.pool,
+                    batch_size=batch_size,
+                    convert_to_numpy=True,
+                    normalize_embeddings=True,
+                    show_progress_bar=False,
+                )
+        else:
+            with torch.inference_mode(), torch.autocast(
+                device_type=self.device,
+                dtype=self.autocast_dtype,
+                enabled=self.autocast,
+            ):
+                embeddings = self.model.encode(
+                    sorted_texts,
+                    batch_size=batch_size,
+                    convert_to_numpy=True,
+                    normalize_embeddings=True,
+                    show_progress_bar=False,
+                )
+        return embeddings.astype(np.float32, copy=False)[inverse]
+
+
+def resolve_device(device: str) -> str:
+    """
+    Resolve o dispositivo configurado para os embeddings.
+
+    Args:
+        device: auto, cpu ou cuda
+
+    Returns:
+        cuda se device for auto e houver GPU disponível, cpu se não houver;
+        caso contrário, o próprio device
+    """
+    if device == "auto":
+        return "cuda" if torch.cuda.is_available() else "cpu"
+    return device
+
+
+def cpu_supports_bf16() -> bool:
+    """
+    Indica se a CPU executa BF16 nativamente (AVX512-BF16 ou AMX).
+
+    Sem essas instruções o BF16 é emulado: mais lento que FP32 e com menos
+    precisão. Versões do PyTorch sem as sondas de CPU são tratadas como sem
+    suporte.
+
+    Returns:
+        True se a CPU tem instruções BF16
+    """
+    probes = ("_is_avx512_bf16_supported", "_is_amx_tile_supported")
+    return any(getattr(torch.cpu, probe, lambda: False)() for probe in probes)
+
+
+def get_embedder(model_name: str, device: str = "auto") -> Embedder:
+    """
+    Retorna o embedder compartilhado pelo processo.
+
+    O modelo é carregado uma única vez por par (model_name, device), de modo
+    que todos os adaptadores reutilizam os mesmos pesos em memória.
+
+    Args:
+        model_name: Modelo de embeddings do Sentence Transformers
+        device: Dispositivo onde o modelo será executado (auto, cpu, cuda)
+
+    Returns:
+        Instância compartilhada de Embedder
+    """
+    # Resolver antes do cache para que "auto" e o dispositivo explícito
+    # compartilhem a mesma instância
+    return _load_embedder(model_name, resolve_device(device))
+
+
+@functools.lru_cache(maxsize=4)
+def _load_embedder(model_name: str, device: str) -> Embedder:
+    """Carrega o modelo e monta o Embedder (uma vez por model_name/device)."""
+    model = SentenceTransformer(model_name, device=device)
+    model.eval()
+
+    # Na CPU, BF16 só compensa com suporte em hardware
+    autocast = settings.EMBEDDING_AUTOCAST and (device != "cpu" or cpu_supports_bf16())
+    precision = "fp32"
+    if autocast:
+        precision = "amp-bf16" if device == "cpu" else "amp-fp16"
+
+    if settings.EMBEDDING_QUANTIZE:
+        if device == "cpu":
+            # Camadas lineares com pesos int8 e ativações quantizadas em
+            # tempo de execução (kernels VNNI); não combinam com autocast BF16
+            model = torch.ao.quantization.quantize_dynamic(
+                model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+            autocast = False
+            precision = "int8"
+        else:
+            model = model.half()
+            precision = "fp16"
+    elif ipex is not None and device == "cpu" and autocast:
+        # Em CPUs Intel, o IPEX troca os kernels por versões BF16 (AMX/AVX512)
+        model = ipex.optimize(model, dtype=torch.bfloat16)
+
+    cache = pool_cache = None
+    if settings.EMBEDDING_CACHE_PATH:
+        # A precisão efetiva entra no namespace: vetores em BF16, FP16 ou
+        # int8 não se misturam com os de precisão cheia
+        cache = EmbeddingCache(
+            settings.EMBEDDING_CACHE_PATH,
+            namespace=f"{model_name}:{precision}",
+        )
+        if autocast:
+            # Os processos do pool rodam o mesmo modelo, mas sem autocast
+            pool_cache = EmbeddingCache(
+                settings.EMBEDDING_CACHE_PATH,
+                namespace=f"{model_name}:fp32",
+            )
+
+    embedder = Embedder(
+        model,
+        batch_size=settings.EMBEDDING_BATCH_SIZE,
+        autocast=autocast,
+        cache=cache,
+        pool_cache=pool_cache,
+    )
+    embedder.warmup()
+    return embedder
+
+
+@functools.lru_cache(maxsize=1024)
+def embed_query(query: str) -> np.ndarray:
+    """
+    Gera o embedding de uma query com o modelo configurado no serviço.
+
+    O resultado é memorizado (LRU) e devolvido como array somente leitura,
+    pois a mesma instância é compartilhada entre chamadas.
+
+    Args:
+        query: Texto da busca
+
+    Returns:
+        Vetor float32 normalizado
+    """
+    embedder = get_embedder(settings.EMBEDDING_MODEL, settings.EMBEDDING_DEVICE)
+    embedding = embedder.encode_query(query)
+    embedding.setflags(write=False)
+    return embedding
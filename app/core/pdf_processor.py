@@ -1,8 +1,152 @@
-import io
-from typing import List
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import os
+import shutil
+import tempfile
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import aclosing
+from typing import AsyncIterator, BinaryIO, Dict, List, Optional, Tuple
 import pdfplumber
-from app.core.vector_store import Document
+from app.core.text_splitter import TextSplitter
+from app.core.vector_store import ChunkMeta, Document, VectorStoreAdapter
+
+try:
+    import pymupdf
+except ImportError:  # pragma: no cover - dependência opcional
+    pymupdf = None
+
+try:
+    import xxhash
+except ImportError:  # pragma: no cover - dependência opcional
+    xxhash = None
+
+logger = logging.getLogger(__name__)
+
+# Páginas extraídas por tarefa enviada ao pool
+PAGE_BATCH_SIZE = 10
+
+# Pool de threads para o trabalho de I/O fora do event loop (cópia do upload,
+# contagem de páginas) e para a extração quando não há pool de processos
+_extraction_pool = ThreadPoolExecutor(max_workers=os.cpu_count())
+
+# Páginas com imagens e menos caracteres que isso são tratadas como escaneadas
+MIN_PAGE_TEXT_CHARS = 10
+
+
+def create_extraction_pool(workers: int = 0) -> ProcessPoolExecutor:
+    """
+    Cria o pool de processos para extrair texto dos PDFs em paralelo.
+
+    Com threads, o GIL limita a extração a um núcleo por vez. Os workers
+    recebem só o caminho do arquivo e devolvem strings, então nada além de
+    tipos básicos cruza a fronteira entre processos.
+
+    Args:
+        workers: Número de processos (0 = um por núcleo)
+
+    Returns:
+        Pool de processos (os workers são criados sob demanda)
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        # O forkserver importa este módulo (e a aplicação) uma única vez; os
+        # workers nascem dele sem repetir os imports
+        context.set_forkserver_preload([__name__])
+    else:
+        context = multiprocessing.get_context("spawn")
+
+    return ProcessPoolExecutor(
+        max_workers=workers or os.cpu_count(),
+        mp_context=context,
+    )
+
+
+def _chunk_hash(chunk: str) -> int:
+    """Hash de 64 bits do conteúdo de um chunk (xxh3 ou, na falta, BLAKE2b)."""
+    data = chunk.encode("utf-8")
+    if xxhash is not None:
+        return xxhash.xxh3_64_intdigest(data)
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+
+def _spool_to_disk(file: BinaryIO) -> str:
+    """
+    Copia o upload para um arquivo temporário nomeado, em blocos.
+
+    Com um caminho em disco, o PyMuPDF carrega as páginas sob demanda em vez
+    de manter o PDF inteiro em um objeto bytes do Python.
+
+    Args:
+        file: Arquivo binário aberto (ex.: UploadFile.file)
+
+    Returns:
+        Caminho do arquivo temporário (removido pelo chamador)
+    """
+    file.seek(0)
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+        shutil.copyfileobj(file, tmp)
+    return tmp.name
+
+
+def _open_pdf(path: str):
+    """Abre o PDF com PyMuPDF (ou pdfplumber, se indisponível)."""
+    if pymupdf is not None:
+        return pymupdf.open(path)
+    return pdfplumber.open(path)
+
+
+def _count_pages(path: str) -> int:
+    """Número de páginas do PDF."""
+    with _open_pdf(path) as pdf:
+        if pymupdf is not None:
+            return pdf.page_count
+        return len(pdf.pages)
+
+
+def _extract_page_range(path: str, start: int, stop: int) -> List[str]:
+    """
+    Extrai o texto das páginas no intervalo [start, stop).
+
+    Cada chamada abre o seu próprio documento: os objetos de documento
+    (PyMuPDF e pdfplumber) não podem ser compartilhados entre threads. Roda
+    em um worker do pool de processos (ou de threads, na falta dele).
+
+    Args:
+        path: Caminho do arquivo PDF
+        start: Primeira página (base 0)
+        stop: Página final (exclusiva)
+
+    Returns:
+        Texto de cada página do intervalo ("" para páginas sem texto e None
+        para páginas só com imagens)
+    """
+    with _open_pdf(path) as pdf:
+        if pymupdf is not None:
+            return [_pymupdf_page_text(pdf.load_page(i)) for i in range(start, stop)]
+        return [_pdfplumber_page_text(pdf.pages[i]) for i in range(start, stop)]
+
+
+def _pymupdf_page_text(page) -> Optional[str]:
+    """Texto de uma página do PyMuPDF, ou None se ela contiver só imagens."""
+    # Sem fontes nos recursos a página não tem como conter texto: descartá-la
+    # antes de interpretar o content stream, caro em páginas escaneadas
+    if not page.get_fonts() and page.get_images():
+        return None
+
+    text = page.get_text("text")
+    if len(text.strip()) < MIN_PAGE_TEXT_CHARS and page.get_images():
+        return None
+    return text
+
+
+def _pdfplumber_page_text(page) -> Optional[str]:
+    """Texto de uma página do pdfplumber, ou None se ela contiver só imagens."""
+    text = page.extract_text() or ""
+    if len(text.strip()) < MIN_PAGE_TEXT_CHARS and page.images:
+        return None
+    return text
 
 
 class PDFProcessor:
@@ -12,6 +156,9 @@ class PDFProcessor:
         self,
         chunk_size: int = 500,
         chunk_overlap: int = 50,
+        page_window: int = 50,
+        ingest_batch_size: int = 128,
+        executor: Optional[Executor] = None,
     ):
         """
         Inicializa o processador de PDF.
@@ -19,18 +166,23 @@ class PDFProcessor:
         Args:
             chunk_size: Tamanho de cada chunk em caracteres
             chunk_overlap: Sobreposição entre chunks
+            page_window: Páginas extraídas por janela no processamento em streaming
+            ingest_batch_size: Chunks enviados ao vector store por chamada em ingest
+            executor: Pool onde as páginas são extraídas (padrão: pool de threads)
         """
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
-        self.text_splitter = RecursiveCharacterTextSplitter(
+        self.page_window = page_window
+        self.ingest_batch_size = ingest_batch_size
+        self.executor = executor or _extraction_pool
+        self.text_splitter = TextSplitter(
             chunk_size=chunk_size,
             chunk_overlap=chunk_overlap,
-            separators=["\n\n", "\n", " ", ""],
         )
 
     async def process_pdf(
         self,
-        file_content: bytes,
+        file: BinaryIO,
         filename: str,
         document_id: str,
         metadata: dict = None,
@@ -38,8 +190,10 @@ class PDFProcessor:
         """
         Processa um arquivo PDF e retorna documentos em chunks.
 
+        Mantém todos os chunks em memória; para PDFs grandes, prefira ingest.
+
         Args:
-            file_content: Conteúdo binário do arquivo PDF
+            file: Arquivo PDF aberto em modo binário (ex.: UploadFile.file)
             filename: Nome do arquivo
             document_id: ID único do documento
             metadata: Metadados adicionais para os chunks
@@ -47,69 +201,262 @@ class PDFProcessor:
         Returns:
             Lista de documentos em chunks
         """
-        try:
-            # Extrair texto do PDF
-            text = self._extract_text_from_pdf(file_content)
+        documents = []
+        chunk_total = 0
+        async with aclosing(self._iter_windows(file, filename, document_id, metadata)) as windows:
+            async for batch, chunk_total in windows:
+                documents.extend(batch)
 
-            if not text.strip():
-                raise ValueError("PDF não contém texto extraível")
+        # Com a extração concluída, o total de chunks (incluindo os repetidos,
+        # que não viram documentos) passa a ser conhecido
+        for doc in documents:
+            doc.chunk = doc.chunk._replace(chunk_total=chunk_total)
 
-            # Dividir em chunks
-            chunks = self.text_splitter.split_text(text)
-
-            # Criar documentos com metadados
-            documents = []
-            default_metadata = {
-                "source_file": filename,
-                "document_id": document_id,
-                **(metadata or {})
-            }
-
-            for idx, chunk in enumerate(chunks):
-                doc = Document(
-                    content=chunk,
-                    metadata={
-                        **default_metadata,
-                        "chunk_index": idx,
-                        "chunk_total": len(chunks),
-                    },
-                    doc_id=f"{document_id}_chunk_{idx}"
-                )
-                documents.append(doc)
+        return documents
+
+    async def ingest(
+        self,
+        file: BinaryIO,
+        filename: str,
+        document_id: str,
+        vector_store: VectorStoreAdapter,
+        collection_name: str,
+        metadata: dict = None,
+    ) -> List[str]:
+        """
+        Processa um PDF em streaming, gravando os chunks no vector store em lotes.
+
+        A memória fica limitada a uma janela de páginas e um lote de chunks,
+        independentemente do tamanho do PDF, e a extração da próxima janela
+        avança enquanto o lote atual gera embeddings. Os chunks não trazem
+        chunk_total, desconhecido até o fim da extração. Se a ingestão
+        falhar, os lotes já gravados são removidos antes de propagar o erro.
 
-            return documents
+        Args:
+            file: Arquivo PDF aberto em modo binário (ex.: UploadFile.file)
+            filename: Nome do arquivo
+            document_id: ID único do documento
+            vector_store: Destino dos chunks
+            collection_name: Coleção onde os chunks serão gravados
+            metadata: Metadados adicionais para os chunks
 
-        except Exception as e:
-            print(f"Erro ao processar PDF {filename}: {str(e)}")
+        Returns:
+            IDs dos chunks gravados
+
+        Raises:
+            ValueError: Se o PDF não contém texto extraível
+        """
+        chunk_ids: List[str] = []
+        # IDs de todos os lotes enviados, inclusive um que falhe no meio da gravação
+        sent_ids: List[str] = []
+        pending: List[Document] = []
+
+        try:
+            async with aclosing(self.iter_chunks(file, filename, document_id, metadata)) as batches:
+                async for batch in batches:
+                    pending.extend(batch)
+                    while len(pending) >= self.ingest_batch_size:
+                        documents = pending[:self.ingest_batch_size]
+                        del pending[:self.ingest_batch_size]
+                        sent_ids.extend(doc.doc_id for doc in documents)
+                        chunk_ids += await vector_store.add_documents(documents, collection_name)
+
+            if pending:
+                sent_ids.extend(doc.doc_id for doc in pending)
+                chunk_ids += await vector_store.add_documents(pending, collection_name)
+
+        except Exception:
+            # Não deixar o documento pela metade na coleção: o cliente recebe
+            # só o erro, sem o document_id para removê-lo depois
+            if sent_ids:
+                removed = await vector_store.delete_documents(sent_ids, collection_name)
+                if chunk_ids and not removed:
+                    logger.error(
+                        "Chunks do documento %s podem ter ficado na coleção %s",
+                        document_id, collection_name
+                    )
             raise
 
-    def _extract_text_from_pdf(self, file_content: bytes) -> str:
+        return chunk_ids
+
+    async def iter_chunks(
+        self,
+        file: BinaryIO,
+        filename: str,
+        document_id: str,
+        metadata: dict = None,
+    ) -> AsyncIterator[List[Document]]:
         """
-        Extrai texto do PDF usando pdfplumber.
+        Gera os chunks do PDF janela a janela de páginas.
+
+        Cada janela de page_window páginas é extraída em lotes paralelos de
+        PAGE_BATCH_SIZE no executor, enquanto a anterior é consumida.
+        O texto que ainda pode formar um chunk com a janela seguinte é levado
+        adiante, de modo que os chunks são os mesmos de dividir o texto
+        inteiro. Páginas só com imagens (escaneadas) são ignoradas.
+
+        Chunks com conteúdo idêntico a um anterior do mesmo documento não
+        geram documentos (nem embeddings). Se o original ainda está na mesma
+        janela, as posições repetidas ficam em seu metadado duplicate_chunks.
 
         Args:
-            file_content: Conteúdo binário do PDF
+            file: Arquivo PDF aberto em modo binário (ex.: UploadFile.file)
+            filename: Nome do arquivo
+            document_id: ID único do documento
+            metadata: Metadados adicionais para os chunks
 
-        Returns:
-            Texto extraído do PDF
+        Yields:
+            Documentos de cada janela (chunk_total fica em aberto)
+
+        Raises:
+            ValueError: Se o PDF não contém texto extraível
         """
+        async with aclosing(self._iter_windows(file, filename, document_id, metadata)) as windows:
+            async for documents, _ in windows:
+                if documents:
+                    yield documents
+
+    async def _iter_windows(
+        self,
+        file: BinaryIO,
+        filename: str,
+        document_id: str,
+        metadata: dict = None,
+    ) -> AsyncIterator[Tuple[List[Document], int]]:
+        """
+        Implementa iter_chunks, informando também quantos chunks (incluindo
+        os repetidos) foram gerados até cada janela.
+
+        Yields:
+            Documentos da janela (possivelmente nenhum) e o total de chunks
+            gerados até ela
+        """
+        default_metadata = {
+            "source_file": filename,
+            "document_id": document_id,
+            **(metadata or {})
+        }
+
+        loop = asyncio.get_running_loop()
+        path = None
+        next_window = None
         try:
-            pdf_file = io.BytesIO(file_content)
-            text = ""
+            # Copiar o upload uma única vez para disco; as janelas o abrem pelo caminho
+            path = await loop.run_in_executor(_extraction_pool, _spool_to_disk, file)
+            page_count = await loop.run_in_executor(_extraction_pool, _count_pages, path)
+
+            chunk_stream = self.text_splitter.stream()
+            chunk_index = 0
+            doc_id_prefix = f"{document_id}_chunk_"
+            # Hash do conteúdo -> posição do primeiro chunk com esse conteúdo;
+            # só inteiros, para não manter o texto de todos os chunks vivo
+            seen: Dict[int, int] = {}
+            image_only_pages: List[int] = []
+            for start in range(0, page_count, self.page_window):
+                stop = min(start + self.page_window, page_count)
+                if next_window is None:
+                    next_window = asyncio.ensure_future(self._extract_window(path, start, stop))
+                page_texts = await next_window
+
+                # Adiantar a extração da próxima janela enquanto esta é consumida
+                next_window = None
+                if stop < page_count:
+                    next_window = asyncio.ensure_future(self._extract_window(
+                        path, stop, min(stop + self.page_window, page_count)
+                    ))
+
+                parts: List[str] = []
+                for page_num, page_text in enumerate(page_texts, start + 1):
+                    if page_text is None:
+                        image_only_pages.append(page_num)
+                    elif page_text:
+                        parts.append(f"\n--- Página {page_num} ---\n")
+                        parts.append(page_text)
+                text = "".join(parts)
+
+                if next_window is None:
+                    chunks = chunk_stream.finish(text)
+                else:
+                    chunks = chunk_stream.feed(text)
+
+                if not chunks:
+                    continue
+
+                # Os metadados são compartilhados pelos chunks da janela; só a
+                # posição de cada um é guardada à parte
+                window_metadata = default_metadata
+                if image_only_pages:
+                    # Páginas escaneadas ignoradas, para um eventual passe de OCR
+                    window_metadata = {
+                        **default_metadata,
+                        "image_only_pages": ",".join(map(str, image_only_pages)),
+                    }
+                    image_only_pages = []
+
+                documents: Dict[int, Document] = {}
+                duplicates: Dict[int, List[int]] = {}
+                for idx, chunk in enumerate(chunks, chunk_index):
+                    original = seen.setdefault(_chunk_hash(chunk), idx)
+                    if original != idx:
+                        if original in documents:
+                            duplicates.setdefault(original, []).append(idx)
+                        continue
 
-            with pdfplumber.open(pdf_file) as pdf:
-                for page_num, page in enumerate(pdf.pages):
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += f"\n--- Página {page_num + 1} ---\n"
-                        text += page_text
+                    documents[idx] = Document(
+                        content=chunk,
+                        metadata=window_metadata,
+                        doc_id=doc_id_prefix + str(idx),
+                        chunk=ChunkMeta(idx)
+                    )
 
-            return text
+                for original, positions in duplicates.items():
+                    doc = documents[original]
+                    doc.metadata = {
+                        **window_metadata,
+                        "duplicate_chunks": ",".join(map(str, positions)),
+                    }
 
-        except Exception as e:
-            print(f"Erro ao extrair texto do PDF: {str(e)}")
+                chunk_index += len(chunks)
+                yield list(documents.values()), chunk_index
+
+            if chunk_index == 0:
+                raise ValueError("PDF não contém texto extraível")
+
+        except Exception:
+            logger.exception("Erro ao processar PDF %s", filename)
             raise
 
+        finally:
+            if next_window is not None:
+                next_window.cancel()
+            if path is not None:
+                os.remove(path)
+
+    async def _extract_window(self, path: str, start: int, stop: int) -> List[Optional[str]]:
+        """
+        Extrai as páginas [start, stop) em lotes paralelos de PAGE_BATCH_SIZE.
+
+        Args:
+            path: Caminho do arquivo PDF
+            start: Primeira página (base 0)
+            stop: Página final (exclusiva)
+
+        Returns:
+            Texto de cada página ("" sem texto, None só com imagens)
+        """
+        loop = asyncio.get_running_loop()
+        batches = await asyncio.gather(*[
+            loop.run_in_executor(
+                self.executor,
+                _extract_page_range,
+                path,
+                batch_start,
+                min(batch_start + PAGE_BATCH_SIZE, stop),
+            )
+            for batch_start in range(start, stop, PAGE_BATCH_SIZE)
+        ])
+        return [page_text for batch in batches for page_text in batch]
+
     def set_chunk_parameters(self, chunk_size: int, chunk_overlap: int):
         """
         Atualiza os parâmetros de chunking.
@@ -120,8 +467,7 @@ class PDFProcessor:
         """
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
-        self.text_splitter = RecursiveCharacterTextSplitter(
+        self.text_splitter = TextSplitter(
             chunk_size=chunk_size,
             chunk_overlap=chunk_overlap,
-            separators=["\n\n", "\n", " ", ""],
         )
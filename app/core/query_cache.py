@@ -0,0 +1,217 @@
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from app.core.vector_store import SearchResult
+
+
+class _CollectionCache:
+    """Entradas em cache de uma coleção, em ordem LRU."""
+
+    def __init__(self):
+        self.entries: "OrderedDict[int, Tuple[np.ndarray, int, List[SearchResult]]]" = OrderedDict()
+        self.next_key = 0
+        self._keys: Optional[np.ndarray] = None
+        self._matrix: Optional[np.ndarray] = None
+
+    def matrix(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Embeddings das queries empilhados (reconstruídos só após mudanças)."""
+        if self._matrix is None:
+            self._keys = np.fromiter(self.entries.keys(), dtype=np.int64)
+            self._matrix = np.stack([entry[0] for entry in self.entries.values()])
+        return self._keys, self._matrix
+
+    def invalidate_matrix(self):
+        self._keys = None
+        self._matrix = None
+
+
+class SemanticQueryCache:
+    """
+    Cache de resultados de busca por similaridade entre queries.
+
+    Uma busca é respondida do cache quando o embedding da nova query tem
+    similaridade de cosseno acima do limiar com uma query já respondida na
+    mesma coleção (e com top_k suficiente).
+    """
+
+    def __init__(self, max_entries: int = 256, threshold: float = 0.95):
+        """
+        Inicializa o cache.
+
+        Args:
+            max_entries: Máximo de queries em cache por coleção (0 desativa)
+            threshold: Similaridade mínima para considerar as queries equivalentes
+        """
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self._collections: Dict[str, _CollectionCache] = {}
+        # Incrementada a cada invalidação da coleção
+        self._generations: Dict[str, int] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def generation(self, collection_name: str) -> int:
+        """
+        Versão atual do cache da coleção, a capturar antes de buscar.
+
+        Args:
+            collection_name: Coleção da busca
+
+        Returns:
+            Número que muda a cada invalidação da coleção
+        """
+        return self._generations.get(collection_name, 0)
+
+    def get(self, collection_name: str, query_embedding: np.ndarray, top_k: int) -> Optional[List[SearchResult]]:
+        """
+        Procura uma query equivalente já respondida.
+
+        Args:
+            collection_name: Coleção da busca
+            query_embedding: Embedding normalizado da query
+            top_k: Número de resultados pedidos
+
+        Returns:
+            Resultados em cache ou None se não houver equivalente
+        """
+        cache = self._collections.get(collection_name)
+        if cache is None or not cache.entries:
+            return None
+
+        keys, matrix = cache.matrix()
+        similarities = matrix @ query_embedding
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.threshold:
+            return None
+
+        key = int(keys[best])
+        _, cached_top_k, results = cache.entries[key]
+        if cached_top_k < top_k:
+            return None
+
+        cache.entries.move_to_end(key)
+        return results[:top_k]
+
+    def put(
+        self,
+        collection_name: str,
+        query_embedding: np.ndarray,
+        top_k: int,
+        results: List[SearchResult],
+        generation: int,
+    ):
+        """
+        Armazena os resultados de uma busca.
+
+        Args:
+            collection_name: Coleção da busca
+            query_embedding: Embedding normalizado da query
+            top_k: Número de resultados pedidos
+            results: Resultados retornados pelo vector store
+            generation: Valor de generation() antes da busca; se a coleção
+                foi invalidada desde então, os resultados podem estar
+                desatualizados e não são guardados
+        """
+        if not self.enabled or generation != self.generation(collection_name):
+            return
+
+        cache = self._collections.setdefault(collection_name, _CollectionCache())
+        cache.entries[cache.next_key] = (query_embedding, top_k, results)
+        cache.next_key += 1
+        while len(cache.entries) > self.max_entries:
+            cache.entries.popitem(last=False)
+        cache.invalidate_matrix()
+
+    def invalidate(self, collection_name: str):
+        """Descarta o cache de uma coleção (após inserções ou remoções)."""
+        self._generations[collection_name] = self.generation(collection_name) + 1
+        self._collections.pop(collection_name, None)
+
+
+class SearchResultCache:
+    """
+    Cache LRU de respostas de busca por query exata.
+
+    A chave é a query normalizada (sem espaços nas pontas, em minúsculas), a
+    coleção e o top_k. Um acerto dispensa o embedding da query e a ida ao
+    vector store.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        """
+        Inicializa o cache.
+
+        Args:
+            max_entries: Máximo de respostas em cache (0 desativa)
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str, int], Any]" = OrderedDict()
+        # Incrementada a cada invalidação da coleção
+        self._generations: Dict[str, int] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    @staticmethod
+    def _key(query: str, collection_name: str, top_k: int) -> Tuple[str, str, int]:
+        return query.strip().lower(), collection_name, top_k
+
+    def generation(self, collection_name: str) -> int:
+        """
+        Versão atual das respostas da coleção, a capturar antes de buscar.
+
+        Args:
+            collection_name: Coleção da busca
+
+        Returns:
+            Número que muda a cada invalidação da coleção
+        """
+        return self._generations.get(collection_name, 0)
+
+    def get(self, query: str, collection_name: str, top_k: int) -> Optional[Any]:
+        """
+        Busca a resposta de uma query já respondida.
+
+        Args:
+            query: Texto da busca
+            collection_name: Coleção da busca
+            top_k: Número de resultados pedidos
+
+        Returns:
+            Resultados em cache ou None
+        """
+        key = self._key(query, collection_name, top_k)
+        results = self._entries.get(key)
+        if results is not None:
+            self._entries.move_to_end(key)
+        return results
+
+    def put(self, query: str, collection_name: str, top_k: int, results: Any, generation: int):
+        """
+        Armazena a resposta de uma busca.
+
+        Args:
+            query: Texto da busca
+            collection_name: Coleção da busca
+            top_k: Número de resultados pedidos
+            results: Resultados a reutilizar (devem ser imutáveis)
+            generation: Valor de generation() antes da busca; se a coleção
+                foi invalidada desde então, a resposta não é guardada
+        """
+        if not self.enabled or generation != self.generation(collection_name):
+            return
+
+        key = self._key(query, collection_name, top_k)
+        self._entries[key] = results
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, collection_name: str):
+        """Descarta as respostas de uma coleção (após inserções ou remoções)."""
+        self._generations[collection_name] = self.generation(collection_name) + 1
+        for key in [key for key in self._entries if key[1] == collection_name]:
+            del self._entries[key]
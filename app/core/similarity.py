@@ -0,0 +1,80 @@
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:  # pragma: no cover - dependência opcional
+    njit = None
+
+
+# Dimensão do modelo padrão (all-MiniLM-L6-v2), especializada no kernel
+SPECIALIZED_DIM = 384
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _dot_scores(matrix, query):
+        rows, dim = matrix.shape
+        scores = np.empty(rows, dtype=np.float32)
+        for i in prange(rows):
+            total = np.float32(0.0)
+            for j in range(dim):
+                total += matrix[i, j] * query[j]
+            scores[i] = total
+        return scores
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _dot_scores_specialized(matrix, query):
+        # O Numba congela SPECIALIZED_DIM como constante de compilação: o laço
+        # interno tem contagem fixa e o LLVM pode desenrolá-lo por completo.
+        rows = matrix.shape[0]
+        scores = np.empty(rows, dtype=np.float32)
+        for i in prange(rows):
+            total = np.float32(0.0)
+            for j in range(SPECIALIZED_DIM):
+                total += matrix[i, j] * query[j]
+            scores[i] = total
+        return scores
+else:
+    _dot_scores = None
+    _dot_scores_specialized = None
+
+
+def cosine_scores(matrix: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """
+    Similaridade de cosseno entre a query e cada linha da matriz.
+
+    Assume vetores já normalizados, então o cosseno é o produto escalar.
+    Com Numba instalado, usa um kernel paralelo (uma thread por bloco de
+    linhas, laço interno vetorizado pelo LLVM), com uma variante de dimensão
+    fixa para D = 384; caso contrário, NumPy/BLAS.
+
+    Args:
+        matrix: Matriz float32 (N x D) com um embedding normalizado por linha
+        query: Vetor float32 (D) normalizado
+
+    Returns:
+        Vetor float32 (N) com os scores
+    """
+    if _dot_scores is None:
+        return matrix @ query
+    if matrix.shape[1] == SPECIALIZED_DIM:
+        return _dot_scores_specialized(matrix, query)
+    return _dot_scores(matrix, query)
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Posições dos k maiores scores, em ordem decrescente.
+
+    Args:
+        scores: Scores de similaridade
+        k: Número de posições a retornar
+
+    Returns:
+        Array com as posições ordenadas por relevância
+    """
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
@@ -0,0 +1,202 @@
+import re
+from bisect import bisect_left, bisect_right
+from typing import List, Tuple
+
+# Caracteres separadores; o nível (parágrafo, linha, palavra) de cada um é
+# decidido pelo caractere anterior, ver TextSplitter._split
+_SEPARATOR_RE = re.compile(r"[\n ]")
+
+# Níveis de separador, em ordem de preferência
+_PARAGRAPH, _LINE, _WORD = range(3)
+
+
+class TextSplitter:
+    """
+    Divide texto em chunks de até chunk_size caracteres com sobreposição.
+
+    Segue a mesma preferência de separadores do RecursiveCharacterTextSplitter
+    (parágrafo, linha, palavra e, em último caso, corte no caractere), mas
+    localiza todos os separadores com uma única varredura da regex
+    pré-compilada e monta os chunks em uma só passada pelo texto.
+    """
+
+    def __init__(self, chunk_size: int = 500, chunk_overlap: int = 50):
+        """
+        Inicializa o splitter.
+
+        Args:
+            chunk_size: Tamanho máximo de cada chunk em caracteres
+            chunk_overlap: Sobreposição entre chunks consecutivos
+
+        Raises:
+            ValueError: Se a sobreposição não for menor que o tamanho do chunk
+        """
+        if chunk_overlap >= chunk_size:
+            raise ValueError("chunk_overlap deve ser menor que chunk_size")
+
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+
+    def split_text(self, text: str) -> List[str]:
+        """
+        Divide o texto em chunks.
+
+        Cada chunk termina no separador de maior preferência que caiba no
+        limite e que vá além do fim do chunk anterior. Um chunk que termina
+        no meio de um parágrafo faz o seguinte recomeçar no primeiro
+        separador dentro da janela de sobreposição; depois de um fim de
+        parágrafo não há sobreposição, como no RecursiveCharacterTextSplitter.
+
+        Args:
+            text: Texto a dividir
+
+        Returns:
+            Lista de chunks sem espaços nas extremidades
+        """
+        chunks, _, _ = self._split(text, 0, 0, final=True)
+        return chunks
+
+    def stream(self) -> "ChunkStream":
+        """
+        Cria um divisor incremental para texto recebido em partes.
+
+        Returns:
+            ChunkStream que produz os mesmos chunks que split_text sobre a
+            concatenação das partes
+        """
+        return ChunkStream(self)
+
+    def _split(
+        self, text: str, start: int, min_end: int, final: bool
+    ) -> Tuple[List[str], int, int]:
+        """
+        Divide text[start:] em uma só passada.
+
+        Os caracteres antes de start só servem para classificar os
+        separadores; min_end é o fim do último chunk já emitido. Sem final,
+        para antes do chunk que ainda pode mudar com mais texto.
+
+        Returns:
+            Chunks, início do restante não dividido e o novo min_end
+        """
+        # Posições logo após cada separador, uma lista por nível. O nível
+        # depende só dos dois caracteres anteriores à posição, então é o
+        # mesmo no texto inteiro e em qualquer trecho que comece antes dela.
+        boundaries: List[List[int]] = [[], [], []]
+        for match in _SEPARATOR_RE.finditer(text):
+            position = match.end()
+            if match.group() == " ":
+                boundaries[_WORD].append(position)
+            elif position >= 2 and text[position - 2] == "\n":
+                boundaries[_PARAGRAPH].append(position)
+            else:
+                boundaries[_LINE].append(position)
+
+        # Qualquer separador serve como início de chunk após a sobreposição
+        starts = sorted(boundaries[_PARAGRAPH] + boundaries[_LINE] + boundaries[_WORD])
+        paragraph_ends = set(boundaries[_PARAGRAPH])
+
+        chunks = []
+        length = len(text)
+        while start < length:
+            end = length
+            if start + self.chunk_size < length:
+                # O chunk precisa de conteúdo novo: terminar depois do anterior
+                end = self._chunk_end(boundaries, max(start, min_end), start + self.chunk_size)
+            elif not final:
+                # O último chunk ainda pode crescer com o próximo trecho
+                break
+
+            chunk = text[start:end].strip()
+            if chunk:
+                chunks.append(chunk)
+            if end >= length:
+                start = length
+                break
+
+            min_end = end
+            if end in paragraph_ends:
+                start = end
+                continue
+
+            # Recomeçar no primeiro separador dentro da sobreposição (ou no
+            # caractere, se não houver nenhum)
+            next_start = end - self.chunk_overlap
+            i = bisect_left(starts, next_start)
+            if i < len(starts) and starts[i] < end:
+                next_start = starts[i]
+            start = next_start if next_start > start else end
+
+        return chunks, start, min_end
+
+    @staticmethod
+    def _chunk_end(boundaries: List[List[int]], lower: int, limit: int) -> int:
+        """Último separador preferido em (lower, limit]; limit se não houver."""
+        for positions in boundaries:
+            i = bisect_right(positions, limit)
+            if i and positions[i - 1] > lower:
+                return positions[i - 1]
+        return limit
+
+
+class ChunkStream:
+    """
+    Divide em chunks um texto que chega em partes (ex.: janelas de páginas).
+
+    Emite só os chunks que não mudariam com a chegada de mais texto e guarda
+    o restante, de modo que o resultado é o mesmo de split_text sobre o
+    texto inteiro.
+    """
+
+    def __init__(self, splitter: TextSplitter):
+        """
+        Inicializa o divisor incremental.
+
+        Args:
+            splitter: TextSplitter com os parâmetros de divisão
+        """
+        self.splitter = splitter
+        self._buffer = ""
+        self._start = 0
+        self._min_end = 0
+
+    def feed(self, text: str) -> List[str]:
+        """
+        Acrescenta um trecho de texto.
+
+        Args:
+            text: Próximo trecho
+
+        Returns:
+            Chunks que ficaram completos com este trecho
+        """
+        buffer = self._buffer + text
+        chunks, start, min_end = self.splitter._split(
+            buffer, self._start, self._min_end, final=False
+        )
+
+        # Manter um caractere antes do restante: ele decide o nível de um
+        # separador logo no início do próximo trecho
+        keep = max(start - 1, 0)
+        self._buffer = buffer[keep:]
+        self._start = start - keep
+        self._min_end = max(min_end - keep, 0)
+        return chunks
+
+    def finish(self, text: str = "") -> List[str]:
+        """
+        Acrescenta o último trecho e divide todo o restante.
+
+        Args:
+            text: Último trecho, se houver
+
+        Returns:
+            Chunks restantes
+        """
+        chunks, _, _ = self.splitter._split(
+            self._buffer + text, self._start, self._min_end, final=True
+        )
+        self._buffer = ""
+        self._start = 0
+        self._min_end = 0
+        return chunks
@@ -1,23 +1,82 @@
+import hashlib
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, NamedTuple, Optional
+import numpy as np
 
 
+def content_hash_id(content: str) -> str:
+    """
+    Gera um ID determinístico a partir do conteúdo do documento.
+
+    Usado quando o documento não traz doc_id: o mesmo conteúdo sempre recebe
+    o mesmo ID, o que torna a reingestão idempotente.
+
+    Args:
+        content: Conteúdo do documento
+
+    Returns:
+        Hash SHA-1 do conteúdo truncado em 16 caracteres hexadecimais
+    """
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()[:16]
+
+
+class ChunkMeta(NamedTuple):
+    """Posição de um chunk dentro do documento de origem."""
+
+    chunk_index: int
+    # None quando o total ainda não é conhecido (ingestão em streaming)
+    chunk_total: Optional[int] = None
+
+
+@dataclass(slots=True)
 class Document:
-    """Representação de um documento no sistema."""
+    """
+    Representação de um documento no sistema.
 
-    def __init__(self, content: str, metadata: Optional[Dict[str, Any]] = None, doc_id: Optional[str] = None):
-        self.content = content
-        self.metadata = metadata or {}
-        self.doc_id = doc_id
+    Os chunks de um mesmo PDF compartilham o dicionário `metadata` (tratado
+    como somente leitura); o que varia por chunk fica em `chunk`.
+    """
+
+    content: str
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    doc_id: Optional[str] = None
+    chunk: Optional[ChunkMeta] = None
+
+    def __post_init__(self):
+        if self.metadata is None:
+            self.metadata = {}
 
+    def to_metadata(self) -> Dict[str, Any]:
+        """
+        Metadados completos do documento, como gravados no vector store.
 
+        Returns:
+            Metadados compartilhados mais a posição do chunk, se houver
+        """
+        if self.chunk is None:
+            return self.metadata
+
+        # Cópia rasa do dicionário compartilhado + atribuições in-place, sem
+        # desempacotar o dicionário em um literal
+        metadata = self.metadata.copy()
+        metadata["chunk_index"] = self.chunk.chunk_index
+        if self.chunk.chunk_total is not None:
+            metadata["chunk_total"] = self.chunk.chunk_total
+        return metadata
+
+
+@dataclass(slots=True)
 class SearchResult:
     """Resultado de busca com conteúdo e pontuação de relevância."""
 
-    def __init__(self, content: str, score: float, metadata: Optional[Dict[str, Any]] = None):
-        self.content = content
-        self.score = score
-        self.metadata = metadata or {}
+    content: str
+    score: float
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+    def __post_init__(self):
+        if self.metadata is None:
+            self.metadata = {}
 
 
 class VectorStoreAdapter(ABC):
@@ -27,13 +86,23 @@ class VectorStoreAdapter(ABC):
     """
 
     @abstractmethod
-    async def add_documents(self, documents: List[Document], collection_name: str) -> List[str]:
+    async def add_documents(
+        self,
+        documents: List[Document],
+        collection_name: str,
+        batch_size: Optional[int] = None,
+    ) -> List[str]:
         """
         Adiciona documentos ao banco vetorial.
 
+        Implementações devem gerar os embeddings de todos os documentos em
+        uma única chamada ao embedder (que os processa em batches), nunca
+        um documento por vez.
+
         Args:
             documents: Lista de documentos a adicionar
             collection_name: Nome da coleção/índice
+            batch_size: Tamanho do batch de encode (padrão: EMBEDDING_BATCH_SIZE)
 
         Returns:
             Lista de IDs dos documentos adicionados
@@ -41,7 +110,13 @@ class VectorStoreAdapter(ABC):
         pass
 
     @abstractmethod
-    async def search(self, query: str, collection_name: str, top_k: int = 5) -> List[SearchResult]:
+    async def search(
+        self,
+        query: str,
+        collection_name: str,
+        top_k: int = 5,
+        query_embedding: Optional[np.ndarray] = None,
+    ) -> List[SearchResult]:
         """
         Busca documentos similares no banco vetorial.
 
@@ -49,6 +124,8 @@ class VectorStoreAdapter(ABC):
             query: Texto a buscar
             collection_name: Nome da coleção/índice
             top_k: Número de resultados a retornar
+            query_embedding: Embedding normalizado da query, se já calculado
+                pelo chamador (evita um novo encode)
 
         Returns:
             Lista de resultados de busca ordenados por relevância
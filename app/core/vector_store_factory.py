@@ -1,3 +1,4 @@
+import functools
 from app.core.config import settings
 from app.core.vector_store import VectorStoreAdapter
 from app.adapters import ChromaDBAdapter, PineconeAdapter, MongoDBAdapter
@@ -7,10 +8,14 @@ class VectorStoreFactory:
     """Factory para criar a instância apropriada de VectorStoreAdapter."""
 
     @staticmethod
+    @functools.lru_cache(maxsize=1)
     def create_vector_store() -> VectorStoreAdapter:
         """
         Cria uma instância do adaptador de banco vetorial baseado na configuração.
 
+        A instância é memorizada: as configurações são lidas uma única vez na
+        inicialização, então todas as chamadas compartilham o mesmo adaptador.
+
         Returns:
             Instância de VectorStoreAdapter
 
@@ -20,7 +25,10 @@ class VectorStoreFactory:
         store_type = settings.VECTOR_STORE_TYPE.lower()
 
         if store_type == "chromadb":
-            return ChromaDBAdapter(model_name=settings.EMBEDDING_MODEL)
+            return ChromaDBAdapter(
+                model_name=settings.EMBEDDING_MODEL,
+                device=settings.EMBEDDING_DEVICE
+            )
 
         elif store_type == "pinecone":
             if not settings.PINECONE_API_KEY:
@@ -29,14 +37,22 @@ class VectorStoreFactory:
                 api_key=settings.PINECONE_API_KEY,
                 cloud=settings.PINECONE_CLOUD,
                 region=settings.PINECONE_REGION,
-                model_name=settings.EMBEDDING_MODEL
+                model_name=settings.EMBEDDING_MODEL,
+                device=settings.EMBEDDING_DEVICE,
+                upsert_batch_size=settings.PINECONE_UPSERT_BATCH_SIZE,
+                upsert_concurrency=settings.PINECONE_UPSERT_CONCURRENCY,
+                index_ready_timeout=settings.PINECONE_INDEX_READY_TIMEOUT
             )
 
         elif store_type == "mongodb":
             return MongoDBAdapter(
                 connection_string=settings.MONGODB_CONNECTION_STRING,
                 database_name=settings.MONGODB_DATABASE_NAME,
-                model_name=settings.EMBEDDING_MODEL
+                model_name=settings.EMBEDDING_MODEL,
+                device=settings.EMBEDDING_DEVICE,
+                vector_index=settings.MONGODB_VECTOR_INDEX,
+                faiss_min_vectors=settings.MONGODB_FAISS_MIN_VECTORS,
+                store_int8=settings.MONGODB_QUANTIZE_EMBEDDINGS
             )
 
         else:
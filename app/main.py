@@ -1,8 +1,77 @@
+import asyncio
+import logging
+import logging.handlers
+import queue
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from app.core import settings
+from fastapi.middleware.gzip import GZipMiddleware
+from app.core import settings, get_embedder, get_pdf_extraction_pool, get_vector_store
 from app.api import router
 
+# Logging da aplicação: quem loga só enfileira o registro; a escrita no
+# stream é feita pela thread do QueueListener. Instalado só no lifespan:
+# processos que importam app.* sem servir a API (workers de extração,
+# scripts, testes) não teriam quem esvaziasse a fila
+_log_queue = queue.SimpleQueue()
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(
+    logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+)
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_handler)
+
+# O formato final é aplicado pelo listener; aqui só a mensagem (+ traceback)
+_queue_handler = logging.handlers.QueueHandler(_log_queue)
+_queue_handler.setFormatter(logging.Formatter("%(message)s"))
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Inicialização e encerramento da aplicação.
+
+    Carrega o modelo de embeddings, cria o vector store compartilhado e abre
+    suas conexões antes de aceitar requisições.
+    """
+    # Iniciado aqui, não no import, para não criar threads nem encher a
+    # fila no forkserver e nos outros processos que importam este módulo
+    root_logger = logging.getLogger()
+    root_logger.setLevel(logging.DEBUG if settings.DEBUG else logging.INFO)
+    root_logger.addHandler(_queue_handler)
+    _log_listener.start()
+
+    embedder = await asyncio.to_thread(
+        get_embedder, settings.EMBEDDING_MODEL, settings.EMBEDDING_DEVICE
+    )
+    await asyncio.to_thread(
+        embedder.start_pool,
+        settings.EMBEDDING_WORKERS,
+        settings.EMBEDDING_POOL_MIN_TEXTS
+    )
+
+    vector_store = await asyncio.to_thread(get_vector_store)
+    app.state.vector_store = vector_store
+    if not await vector_store.health_check():
+        logger.warning(
+            "Vector store %s indisponível na inicialização",
+            settings.VECTOR_STORE_TYPE
+        )
+
+    # Pool de processos para extração de texto dos PDFs
+    app.state.pdf_pool = get_pdf_extraction_pool()
+
+    yield
+
+    await asyncio.to_thread(app.state.pdf_pool.shutdown, cancel_futures=True)
+    await asyncio.to_thread(embedder.stop_pool)
+    # Parar de enfileirar antes de o listener escrever o que restou na fila
+    root_logger.removeHandler(_queue_handler)
+    _log_listener.stop()
+
+
 # Criar aplicação FastAPI
 app = FastAPI(
     title=settings.API_TITLE,
@@ -11,6 +80,8 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Configurar CORS
@@ -22,6 +93,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Comprimir respostas maiores que 1 KB (ex.: buscas com top_k alto)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 
 # Incluir rotas da API
 app.include_router(router)
@@ -34,11 +108,9 @@ async def health_check():
 
     Retorna status da API, configurações e saúde do vector store.
     """
-    from app.core.vector_store_factory import VectorStoreFactory
-
     try:
-        # Verificar vector store
-        vector_store = VectorStoreFactory.create_vector_store()
+        # Verificar vector store compartilhado (criado no lifespan)
+        vector_store = app.state.vector_store
         vector_store_healthy = await vector_store.health_check()
 
         return {
@@ -69,11 +141,27 @@ async def health_check():
 
 
 if __name__ == "__main__":
+    import os
     import uvicorn
 
+    # Event loop e parser HTTP em C quando disponíveis (uvloop não suporta Windows)
+    try:
+        import uvloop  # noqa: F401
+        loop = "uvloop"
+    except ImportError:
+        loop = "asyncio"
+    try:
+        import httptools  # noqa: F401
+        http = "httptools"
+    except ImportError:
+        http = "h11"
+
     uvicorn.run(
         "app.main:app",
         host=settings.HOST,
         port=settings.PORT,
         reload=settings.DEBUG,
+        loop=loop,
+        http=http,
+        workers=1 if settings.DEBUG else (settings.WORKERS or os.cpu_count()),
     )
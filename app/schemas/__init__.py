@@ -1,10 +1,18 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional, Dict, Any
 
+# Requisições: rejeita campos desconhecidos e normaliza espaços nas strings
+REQUEST_CONFIG = ConfigDict(extra="forbid", frozen=True, str_strip_whitespace=True)
+
+# Respostas: imutáveis, construídas uma vez e serializadas
+RESPONSE_CONFIG = ConfigDict(frozen=True)
+
 
 class DocumentUploadRequest(BaseModel):
     """Schema para requisição de upload de documento."""
 
+    model_config = REQUEST_CONFIG
+
     collection_name: str = Field(
         ...,
         description="Nome da coleção onde o documento será armazenado"
@@ -18,6 +26,8 @@ class DocumentUploadRequest(BaseModel):
 class DocumentUploadResponse(BaseModel):
     """Schema para resposta de upload de documento."""
 
+    model_config = RESPONSE_CONFIG
+
     document_id: str = Field(description="ID único do documento")
     filename: str = Field(description="Nome do arquivo")
     collection_name: str = Field(description="Coleção onde foi armazenado")
@@ -29,6 +39,8 @@ class DocumentUploadResponse(BaseModel):
 class SearchQuery(BaseModel):
     """Schema para requisição de busca."""
 
+    model_config = REQUEST_CONFIG
+
     query: str = Field(
         ...,
         min_length=1,
@@ -49,6 +61,8 @@ class SearchQuery(BaseModel):
 class SearchResultItem(BaseModel):
     """Um item de resultado de busca."""
 
+    model_config = RESPONSE_CONFIG
+
     content: str = Field(description="Conteúdo do documento")
     score: float = Field(description="Score de relevância (0-1)")
     metadata: Dict[str, Any] = Field(description="Metadados do documento")
@@ -57,6 +71,8 @@ class SearchResultItem(BaseModel):
 class SearchResponse(BaseModel):
     """Schema para resposta de busca."""
 
+    model_config = RESPONSE_CONFIG
+
     query: str = Field(description="Query executada")
     collection_name: str = Field(description="Coleção pesquisada")
     results: List[SearchResultItem] = Field(
@@ -67,6 +83,8 @@ class SearchResponse(BaseModel):
 class HealthCheckResponse(BaseModel):
     """Schema para resposta de health check."""
 
+    model_config = RESPONSE_CONFIG
+
     status: str = Field(description="Status da aplicação")
     vector_store: str = Field(description="Tipo de vector store")
     vector_store_healthy: bool = Field(
@@ -76,5 +94,7 @@ class HealthCheckResponse(BaseModel):
 class ErrorResponse(BaseModel):
     """Schema para respostas de erro."""
 
+    model_config = RESPONSE_CONFIG
+
     detail: str = Field(description="Descrição do erro")
     error_code: str = Field(description="Código do erro")
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+import torch
+from app.core.embedding_cache import EmbeddingCache
+from app.core.embeddings import Embedder, cpu_supports_bf16
+
+
+@pytest.mark.parametrize(
+    "avx512_bf16, amx, expected",
+    [(False, False, False), (True, False, True), (False, True, True)],
+)
+def test_cpu_supports_bf16(monkeypatch, avx512_bf16, amx, expected):
+    monkeypatch.setattr(torch.cpu, "_is_avx512_bf16_supported", lambda: avx512_bf16, raising=False)
+    monkeypatch.setattr(torch.cpu, "_is_amx_tile_supported", lambda: amx, raising=False)
+
+    assert cpu_supports_bf16() is expected
+
+
+def test_cpu_supports_bf16_without_probes(monkeypatch):
+    monkeypatch.delattr(torch.cpu, "_is_avx512_bf16_supported", raising=False)
+    monkeypatch.delattr(torch.cpu, "_is_amx_tile_supported", raising=False)
+
+    assert cpu_supports_bf16() is False
+
+
+class _FakeModel:
+    """Modelo que registra se cada chamada usou o pool de processos."""
+
+    device = torch.device("cpu")
+
+    def __init__(self):
+        self.pool_calls = []
+
+    def get_sentence_embedding_dimension(self):
+        return 4
+
+    def encode(self, texts, pool=None, **kwargs):
+        self.pool_calls.append(pool is not None)
+        return np.ones((len(texts), 4), dtype=np.float32) / 2
+
+
+def test_pooled_vectors_use_pool_cache_namespace(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = EmbeddingCache(path, namespace="modelo:amp-bf16")
+    pool_cache = EmbeddingCache(path, namespace="modelo:fp32")
+    model = _FakeModel()
+    embedder = Embedder(model, autocast=True, cache=cache, pool_cache=pool_cache)
+    embedder.pool = {"processes": []}
+    embedder.pool_min_texts = 3
+
+    embedder.encode(["a", "b", "c"])
+    embedder.encode(["d"])
+
+    assert model.pool_calls == [True, False]
+    assert [vector is not None for vector in pool_cache.get_many(["a", "b", "c", "d"])] == [
+        True, True, True, False
+    ]
+    assert [vector is not None for vector in cache.get_many(["a", "b", "c", "d"])] == [
+        False, False, False, True
+    ]
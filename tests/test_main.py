@@ -0,0 +1,36 @@
+import asyncio
+import logging
+from types import SimpleNamespace
+
+from app import main
+
+
+def _queue_handlers():
+    return [h for h in logging.getLogger().handlers if h is main._queue_handler]
+
+
+def test_import_does_not_install_queue_handler():
+    assert _queue_handlers() == []
+    assert main._log_listener._thread is None
+
+
+def test_lifespan_installs_and_removes_queue_handler(monkeypatch):
+    async def healthy():
+        return True
+
+    embedder = SimpleNamespace(start_pool=lambda *args: None, stop_pool=lambda: None)
+    monkeypatch.setattr(main, "get_embedder", lambda *args: embedder)
+    monkeypatch.setattr(main, "get_vector_store", lambda: SimpleNamespace(health_check=healthy))
+    monkeypatch.setattr(
+        main, "get_pdf_extraction_pool", lambda: SimpleNamespace(shutdown=lambda **kwargs: None)
+    )
+
+    async def run():
+        async with main.lifespan(main.app):
+            assert _queue_handlers() == [main._queue_handler]
+            assert main._log_listener._thread is not None
+
+    asyncio.run(run())
+
+    assert _queue_handlers() == []
+    assert main._log_listener._thread is None
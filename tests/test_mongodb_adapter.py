@@ -0,0 +1,229 @@
+import asyncio
+import zlib
+from collections import defaultdict
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from bson import Binary
+from app.adapters import mongodb_adapter
+from app.adapters.mongodb_adapter import (
+    MongoDBAdapter,
+    _EmbeddingMatrix,
+    decode_embedding,
+    quantize_embeddings,
+)
+from app.core.vector_store import Document
+
+
+def _normalized_vectors(rows: int, dim: int = 384, seed: int = 0) -> np.ndarray:
+    vectors = np.random.default_rng(seed).standard_normal((rows, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _stored(vectors: np.ndarray) -> list:
+    """Documentos como gravados pelo adaptador com quantização ativa."""
+    quantized, scales = quantize_embeddings(vectors)
+    return [
+        {"embedding": Binary(row.tobytes()), "scale": float(scale)}
+        for row, scale in zip(quantized, scales)
+    ]
+
+
+def test_quantize_decode_round_trip():
+    vectors = _normalized_vectors(20)
+
+    for vector, stored in zip(vectors, _stored(vectors)):
+        decoded = decode_embedding(stored)
+        assert decoded.dtype == np.float32
+        np.testing.assert_allclose(decoded, vector, atol=stored["scale"] / 2 + 1e-6)
+
+
+def test_decode_float_list():
+    vector = _normalized_vectors(1)[0]
+
+    decoded = decode_embedding({"embedding": vector.tolist()})
+
+    np.testing.assert_allclose(decoded, vector, rtol=1e-6)
+
+
+def test_embedding_matrix_search_on_decoded_vectors():
+    vectors = _normalized_vectors(50)
+    matrix = np.vstack([decode_embedding(stored) for stored in _stored(vectors)])
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    ids = [f"doc_{i}" for i in range(len(vectors))]
+
+    cached = _EmbeddingMatrix(
+        ids, [f"conteúdo {i}" for i in range(len(vectors))], [{} for _ in ids], matrix
+    )
+    positions, scores = cached.search(vectors[7], top_k=3)
+
+    assert len(positions) == 3
+    assert positions[0] == 7
+    assert scores[0] > 0.99
+    assert list(scores) == sorted(scores, reverse=True)
+
+
+def test_embedding_matrix_append_to_empty_collection():
+    vectors = _normalized_vectors(10)
+    cached = _EmbeddingMatrix([], [], [], np.empty((0,), dtype=np.float32))
+
+    cached.append(["a", "b"], ["x", "y"], [{}, {}], vectors[:2])
+    cached.append(["c"], ["z"], [{}], vectors[2:3])
+
+    positions, _ = cached.search(vectors[2], top_k=5)
+    assert len(positions) == 3
+    assert cached.ids[positions[0]] == "c"
+
+
+def test_embedding_matrix_grows_without_copying_every_append():
+    vectors = _normalized_vectors(100)
+    cached = _EmbeddingMatrix([], [], [], np.empty((0,), dtype=np.float32))
+
+    capacities = set()
+    for i in range(0, len(vectors), 5):
+        cached.append([f"doc_{j}" for j in range(i, i + 5)], [""] * 5, [{}] * 5, vectors[i:i + 5])
+        capacities.add(len(cached._buffer))
+
+    # A capacidade só dobra: 5, 10, 20, 40, 80, 160
+    assert len(capacities) == 6
+    np.testing.assert_array_equal(cached.matrix, vectors)
+    positions, _ = cached.search(vectors[42], top_k=1)
+    assert cached.ids[positions[0]] == "doc_42"
+
+
+def test_embedding_matrix_drops_buffer_once_indexed():
+    pytest.importorskip("faiss")
+    vectors = _normalized_vectors(40)
+    ids = [f"doc_{i}" for i in range(30)]
+    cached = _EmbeddingMatrix(ids, [""] * 30, [{}] * 30, vectors[:30].copy(), faiss_min_vectors=32)
+    assert cached.index is None
+
+    cached.append(["doc_30", "doc_31"], ["", ""], [{}, {}], vectors[30:32])
+    assert cached.index is not None
+    assert cached.matrix is None
+
+    cached.append(["doc_32"], [""], [{}], vectors[32:33])
+    positions, scores = cached.search(vectors[32], top_k=3)
+    assert cached.ids[positions[0]] == "doc_32"
+    assert scores[0] > 0.99
+
+
+def _text_vector(text: str) -> np.ndarray:
+    vector = np.random.default_rng(zlib.crc32(text.encode())).standard_normal(384)
+    return (vector / np.linalg.norm(vector)).astype(np.float32)
+
+
+class _FakeEmbedder:
+    def encode(self, texts, batch_size=None):
+        return np.vstack([_text_vector(text) for text in texts])
+
+    def encode_query(self, query):
+        return _text_vector(query)
+
+
+class _FakeCollection:
+    """Coleção em memória; os hooks simulam operações concorrentes."""
+
+    def __init__(self):
+        self.docs = {}
+        # Chamado entre a leitura do snapshot do find() e o seu retorno
+        self.find_hook = None
+        # Chamado depois de aplicar o bulk_write
+        self.write_hook = None
+
+    def find(self, query, projection=None):
+        if "_id" in query:
+            return [{"_id": doc_id} for doc_id in query["_id"]["$in"] if doc_id in self.docs]
+        snapshot = [dict(doc) for doc in self.docs.values()]
+        hook, self.find_hook = self.find_hook, None
+        if hook:
+            hook()
+        return iter(snapshot)
+
+    def bulk_write(self, operations, ordered=True):
+        for operation in operations:
+            self.docs[operation._doc["_id"]] = operation._doc
+        hook, self.write_hook = self.write_hook, None
+        if hook:
+            hook()
+
+    def delete_many(self, query):
+        ids = [doc_id for doc_id in query["_id"]["$in"] if doc_id in self.docs]
+        for doc_id in ids:
+            del self.docs[doc_id]
+        return SimpleNamespace(deleted_count=len(ids))
+
+    def drop(self):
+        self.docs.clear()
+
+
+class _FakeClient:
+    def __init__(self, *args, **kwargs):
+        self.database = defaultdict(_FakeCollection)
+
+    def __getitem__(self, name):
+        return self.database
+
+
+@pytest.fixture
+def adapter(monkeypatch):
+    monkeypatch.setattr(mongodb_adapter, "MongoClient", _FakeClient)
+    monkeypatch.setattr(mongodb_adapter, "get_embedder", lambda *args: _FakeEmbedder())
+    return MongoDBAdapter("mongodb://localhost")
+
+
+def _add(adapter, start, stop):
+    documents = [Document(content=f"conteúdo {i}", doc_id=f"doc_{i}") for i in range(start, stop)]
+    return asyncio.run(adapter.add_documents(documents, "docs"))
+
+
+def test_insert_during_matrix_load_is_searchable(adapter):
+    _add(adapter, 0, 5)
+    adapter.db["docs"].find_hook = lambda: _add(adapter, 5, 10)
+
+    adapter._load_matrix("docs")
+
+    results = asyncio.run(adapter.search("conteúdo 7", "docs", top_k=1))
+    assert results[0].content == "conteúdo 7"
+    assert len(adapter._load_matrix("docs").ids) == 10
+
+
+def test_matrix_load_during_insert_does_not_duplicate(adapter):
+    _add(adapter, 0, 5)
+    adapter.db["docs"].write_hook = lambda: adapter._load_matrix("docs")
+
+    _add(adapter, 5, 10)
+
+    assert sorted(adapter._load_matrix("docs").ids) == [f"doc_{i}" for i in range(10)]
+
+
+def test_delete_during_matrix_load_is_not_undone(adapter):
+    _add(adapter, 0, 5)
+    adapter.db["docs"].find_hook = lambda: asyncio.run(adapter.delete_documents(["doc_3"], "docs"))
+
+    adapter._load_matrix("docs")
+
+    assert "doc_3" not in adapter._load_matrix("docs").ids
+
+
+def test_insert_appends_to_loaded_matrix(adapter):
+    _add(adapter, 0, 5)
+    cached = adapter._load_matrix("docs")
+
+    _add(adapter, 5, 10)
+
+    assert adapter._load_matrix("docs") is cached
+    assert len(cached.ids) == 10
+
+
+@pytest.mark.parametrize("store_int8", [True, False])
+def test_stored_embeddings_decode_to_original(adapter, store_int8):
+    adapter.store_int8 = store_int8
+    _add(adapter, 0, 3)
+
+    for stored in adapter.db["docs"].docs.values():
+        assert isinstance(stored["embedding"], Binary) is store_int8
+        np.testing.assert_allclose(
+            decode_embedding(stored), _text_vector(stored["content"]), atol=0.01
+        )
@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+from app.core import pdf_processor
+from app.core.pdf_processor import PDFProcessor, _chunk_hash
+from app.core.vector_store import Document
+
+
+def test_chunk_hash_identifies_repeated_content():
+    chunk = "Política de férias — colaboradores no exterior"
+
+    assert _chunk_hash(chunk) == _chunk_hash("".join(list(chunk)))
+    assert _chunk_hash(chunk) != _chunk_hash(chunk + ".")
+
+
+def test_chunk_hash_without_xxhash(monkeypatch):
+    monkeypatch.setattr(pdf_processor, "xxhash", None)
+
+    assert _chunk_hash("férias") == _chunk_hash("férias")
+    assert _chunk_hash("férias") != _chunk_hash("ferias")
+
+
+class _FailingStore:
+    """Vector store em memória que falha a partir do lote fail_on."""
+
+    def __init__(self, fail_on: int):
+        self.fail_on = fail_on
+        self.calls = 0
+        self.stored = {}
+
+    async def add_documents(self, documents, collection_name):
+        self.calls += 1
+        if self.calls == self.fail_on:
+            # Falha depois de gravar parte do lote
+            self.stored[documents[0].doc_id] = documents[0]
+            raise RuntimeError("falha no vector store")
+        for doc in documents:
+            self.stored[doc.doc_id] = doc
+        return [doc.doc_id for doc in documents]
+
+    async def delete_documents(self, doc_ids, collection_name):
+        for doc_id in doc_ids:
+            self.stored.pop(doc_id, None)
+        return True
+
+
+def _processor_with_chunks(count: int) -> PDFProcessor:
+    processor = PDFProcessor(ingest_batch_size=4)
+
+    async def iter_chunks(file, filename, document_id, metadata=None):
+        for start in range(0, count, 3):
+            yield [
+                Document(content=f"chunk {i}", metadata={}, doc_id=f"{document_id}_chunk_{i}")
+                for i in range(start, min(start + 3, count))
+            ]
+
+    processor.iter_chunks = iter_chunks
+    return processor
+
+
+@pytest.mark.parametrize("fail_on", [1, 2, 3])
+def test_ingest_removes_stored_batches_on_failure(fail_on):
+    store = _FailingStore(fail_on)
+    processor = _processor_with_chunks(10)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(processor.ingest(None, "doc.pdf", "doc", store, "documents"))
+
+    assert store.stored == {}
+
+
+def test_ingest_stores_all_batches():
+    store = _FailingStore(fail_on=0)
+    processor = _processor_with_chunks(10)
+
+    chunk_ids = asyncio.run(processor.ingest(None, "doc.pdf", "doc", store, "documents"))
+
+    assert chunk_ids == [f"doc_chunk_{i}" for i in range(10)]
+    assert set(store.stored) == set(chunk_ids)
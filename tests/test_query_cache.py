@@ -0,0 +1,144 @@
+import numpy as np
+from app.core.query_cache import SearchResultCache, SemanticQueryCache
+from app.core.vector_store import SearchResult
+
+
+def _vector(seed: int, dim: int = 384) -> np.ndarray:
+    vector = np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def _nearby(vector: np.ndarray, noise: float, seed: int = 99) -> np.ndarray:
+    """Vetor normalizado próximo de vector (similaridade cai com noise)."""
+    other = vector + noise * _vector(seed)
+    return other / np.linalg.norm(other)
+
+
+def _results(count: int, label: str = "doc") -> list:
+    return [SearchResult(content=f"{label} {i}", score=1.0 - i / 10) for i in range(count)]
+
+
+def _put(cache, collection, embedding, top_k, results):
+    cache.put(collection, embedding, top_k, results, cache.generation(collection))
+
+
+def test_similar_query_hits_above_threshold():
+    cache = SemanticQueryCache(threshold=0.95)
+    query = _vector(1)
+    results = _results(5)
+    _put(cache, "docs", query, 5, results)
+
+    assert cache.get("docs", _nearby(query, 0.05), 5) == results
+    assert cache.get("docs", _nearby(query, 1.0), 5) is None
+    assert cache.get("docs", _vector(2), 5) is None
+
+
+def test_cached_top_k_must_cover_request():
+    cache = SemanticQueryCache()
+    query = _vector(1)
+    _put(cache, "docs", query, 5, _results(5))
+
+    assert [r.content for r in cache.get("docs", query, 3)] == ["doc 0", "doc 1", "doc 2"]
+    assert cache.get("docs", query, 10) is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = SemanticQueryCache(max_entries=2)
+    first, second, third = _vector(1), _vector(2), _vector(3)
+    _put(cache, "docs", first, 5, _results(5, "first"))
+    _put(cache, "docs", second, 5, _results(5, "second"))
+
+    # Usar a primeira query a torna a mais recente
+    assert cache.get("docs", first, 5) is not None
+    _put(cache, "docs", third, 5, _results(5, "third"))
+
+    assert cache.get("docs", first, 5) is not None
+    assert cache.get("docs", second, 5) is None
+    assert cache.get("docs", third, 5) is not None
+
+
+def test_invalidate_drops_only_that_collection():
+    cache = SemanticQueryCache()
+    query = _vector(1)
+    _put(cache, "docs", query, 5, _results(5))
+    _put(cache, "other", query, 5, _results(5))
+
+    cache.invalidate("docs")
+
+    assert cache.get("docs", query, 5) is None
+    assert cache.get("other", query, 5) is not None
+
+
+def test_put_after_invalidation_during_search_is_ignored():
+    cache = SemanticQueryCache()
+    query = _vector(1)
+
+    generation = cache.generation("docs")
+    # Um upload invalida a coleção enquanto a busca aguarda o vector store
+    cache.invalidate("docs")
+    cache.put("docs", query, 5, _results(5), generation)
+
+    assert cache.get("docs", query, 5) is None
+
+
+def test_disabled_cache_stores_nothing():
+    cache = SemanticQueryCache(max_entries=0)
+    query = _vector(1)
+    _put(cache, "docs", query, 5, _results(5))
+
+    assert cache.get("docs", query, 5) is None
+
+
+def _put_response(cache, query, collection, top_k, results):
+    cache.put(query, collection, top_k, results, cache.generation(collection))
+
+
+def test_search_cache_matches_normalized_query():
+    cache = SearchResultCache()
+    results = _results(3)
+    _put_response(cache, "Política de Férias", "docs", 3, results)
+
+    assert cache.get("  política de férias ", "docs", 3) is results
+    assert cache.get("política de férias", "docs", 5) is None
+    assert cache.get("política de férias", "other", 3) is None
+
+
+def test_search_cache_evicts_least_recently_used():
+    cache = SearchResultCache(max_entries=2)
+    _put_response(cache, "a", "docs", 5, _results(1, "a"))
+    _put_response(cache, "b", "docs", 5, _results(1, "b"))
+
+    assert cache.get("a", "docs", 5) is not None
+    _put_response(cache, "c", "docs", 5, _results(1, "c"))
+
+    assert cache.get("a", "docs", 5) is not None
+    assert cache.get("b", "docs", 5) is None
+    assert cache.get("c", "docs", 5) is not None
+
+
+def test_search_cache_invalidate_drops_only_that_collection():
+    cache = SearchResultCache()
+    _put_response(cache, "férias", "docs", 5, _results(1))
+    _put_response(cache, "férias", "other", 5, _results(1))
+
+    cache.invalidate("docs")
+
+    assert cache.get("férias", "docs", 5) is None
+    assert cache.get("férias", "other", 5) is not None
+
+
+def test_search_cache_put_after_invalidation_during_search_is_ignored():
+    cache = SearchResultCache()
+
+    generation = cache.generation("docs")
+    cache.invalidate("docs")
+    cache.put("férias", "docs", 5, _results(1), generation)
+
+    assert cache.get("férias", "docs", 5) is None
+
+
+def test_disabled_search_cache_stores_nothing():
+    cache = SearchResultCache(max_entries=0)
+    _put_response(cache, "férias", "docs", 5, _results(1))
+
+    assert cache.get("férias", "docs", 5) is None
@@ -0,0 +1,94 @@
+import random
+
+import pytest
+from app.core.text_splitter import TextSplitter
+
+_WORDS = "contrato férias benefício salário colaborador política jornada licença reembolso admissão".split()
+
+
+def _multi_paragraph_text(seed: int) -> str:
+    """Parágrafos de várias linhas, como o texto extraído de um PDF."""
+    rng = random.Random(seed)
+    paragraphs = []
+    for _ in range(rng.randrange(5, 30)):
+        lines = [
+            "Linha " + " ".join(rng.choice(_WORDS) for _ in range(rng.randrange(3, 15)))
+            for _ in range(rng.randrange(1, 8))
+        ]
+        paragraphs.append("\n".join(lines))
+    return "\n\n".join(paragraphs)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_chunks_fit_and_cover_text(seed):
+    text = _multi_paragraph_text(seed)
+
+    chunks = TextSplitter(chunk_size=500, chunk_overlap=50).split_text(text)
+
+    assert all(0 < len(chunk) <= 500 for chunk in chunks)
+    # Cada chunk é um trecho do texto, em ordem, sem deixar conteúdo de fora
+    position = covered = 0
+    for chunk in chunks:
+        found = text.find(chunk, position)
+        assert found >= 0
+        assert not text[covered:found].strip()
+        position = found + 1
+        covered = max(covered, found + len(chunk))
+    assert not text[covered:].strip()
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_no_chunk_repeats_previous_after_paragraph_break(seed):
+    chunks = TextSplitter(chunk_size=500, chunk_overlap=50).split_text(_multi_paragraph_text(seed))
+
+    assert not any(current in previous for previous, current in zip(chunks, chunks[1:]))
+
+
+def test_overlap_only_within_paragraph():
+    text = " ".join(f"palavra{i}" for i in range(100))
+
+    chunks = TextSplitter(chunk_size=100, chunk_overlap=30).split_text(text)
+
+    for previous, current in zip(chunks, chunks[1:]):
+        assert current.split()[0] in previous.split()
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_chunk_count_not_above_recursive_splitter(seed):
+    splitters = pytest.importorskip("langchain_text_splitters")
+    text = _multi_paragraph_text(seed)
+
+    chunks = TextSplitter(chunk_size=500, chunk_overlap=50).split_text(text)
+    expected = splitters.RecursiveCharacterTextSplitter(
+        chunk_size=500, chunk_overlap=50
+    ).split_text(text)
+
+    assert len(chunks) <= len(expected)
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_stream_matches_split_text(seed):
+    rng = random.Random(seed)
+    chunk_size = rng.choice([20, 50, 100, 500])
+    splitter = TextSplitter(chunk_size, rng.randrange(0, chunk_size // 2 + 1))
+    pieces = ["a", "b", "ccc", " ", "  ", "\n", "\n\n"]
+    text = "".join(rng.choice(pieces) for _ in range(rng.randrange(0, 600)))
+    cuts = sorted(rng.sample(range(len(text) + 1), min(len(text) + 1, rng.randrange(0, 8))))
+    parts = [text[i:j] for i, j in zip([0, *cuts], [*cuts, len(text)])]
+
+    stream = splitter.stream()
+    chunks = [chunk for part in parts[:-1] for chunk in stream.feed(part)]
+    chunks += stream.finish(parts[-1])
+
+    assert chunks == splitter.split_text(text)
+
+
+def test_stream_matches_split_text_on_page_windows():
+    splitter = TextSplitter(chunk_size=500, chunk_overlap=50)
+    pages = [f"\n--- Página {i} ---\n{_multi_paragraph_text(i)}\n" for i in range(1, 7)]
+
+    stream = splitter.stream()
+    chunks = stream.feed("".join(pages[:2])) + stream.feed("".join(pages[2:4]))
+    chunks += stream.finish("".join(pages[4:]))
+
+    assert chunks == splitter.split_text("".join(pages))